@@ -137,6 +137,28 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Cache (raporty) - lokalny backend w pamięci procesu.
+# Przy wielu workerach warto wskazać wspólny backend (np. FileBasedCache / Redis),
+# aby unieważnianie wersji ankiet było widoczne we wszystkich procesach.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'evaluation-ats',
+    }
+}
+REPORTS_CACHE_ALIAS = 'default'
+REPORTS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Pliki PDF generowane w tle (manage.py pdf_worker) - klucz: rodzaj, odpowiedź, wersja danych
+PDF_CACHE_DIR = BASE_DIR / 'pdf_cache'
+# Liczba równoległych procesów (wykres + wkhtmltopdf) workera PDF, także dla paczek ZIP
+PDF_WORKER_PROCESSES = 2
+# Wykresy radarowe PDF (reports.chart_cache) - tyle ostatnich w pamięci procesu, pozostałe w PDF_CACHE_DIR/charts
+CHART_CACHE_MEMORY_ITEMS = 256
+# Wykresy radarowe PDF: "svg" (bez matplotlib) lub "matplotlib" (obrazek PNG)
+PDF_CHART_RENDERER = "svg"
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -159,6 +181,28 @@ WKHTMLTOPDF_CMD_OPTIONS = {
     'enable-local-file-access': True
 }
 
+# Generowanie PDF (reports.pdf_backends): "pool" - długo działające procesy wkhtmltopdf zasilane przez potoki,
+# "subprocess" - nowy proces wkhtmltopdf dla każdego dokumentu (także awaryjnie, gdy proces z puli zawiedzie)
+PDF_BACKEND = "pool"
+# Najwięcej procesów wkhtmltopdf na proces aplikacji; kolejne żądania czekają najwyżej PDF_POOL_QUEUE_TIMEOUT s
+PDF_POOL_SIZE = 2
+PDF_POOL_QUEUE_TIMEOUT = 30
+PDF_RENDER_TIMEOUT = 120
+# Czasy etapów PDF (reports.pdf_timing) zapisywane w bazie - percentyle: manage.py pdf_timings
+PDF_TIMING_STORE = True
+
+# Linie pdf_timing (klucz=wartość) z czasami etapów generowania PDF na konsolę
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'reports': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 # =========================
 # Gmail SMTP Configuration
 # =========================
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from evaluations.rollups import refresh_status_rollups
+from surveys.models import SurveyResponse
+
+
+class Command(BaseCommand):
+    help = "Uzupełnia statusy ocen managera i HR zapisane na odpowiedziach (manager_status, hr_status i daty)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--survey", type=int, action="append", help="ID ankiety (można podać wiele razy)")
+        parser.add_argument("--year", type=int, help="Tylko ankiety z danego roku")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        responses = SurveyResponse.objects.all()
+        if options["survey"]:
+            responses = responses.filter(survey_id__in=options["survey"])
+        if options["year"]:
+            responses = responses.filter(survey__year=options["year"])
+
+        # oceny managera nie mają daty wysłania - dla już wysłanych przyjmujemy datę ostatniej zmiany odpowiedzi
+        response_ids = list(responses.order_by("id").values_list("id", flat=True))
+        batch_size = options["batch_size"]
+        updated = 0
+        for start in range(0, len(response_ids), batch_size):
+            with transaction.atomic():
+                updated += refresh_status_rollups(
+                    SurveyResponse.objects.filter(id__in=response_ids[start:start + batch_size]),
+                    submitted_at=F("updated_at"),
+                )
+        self.stdout.write(self.style.SUCCESS(f"Uzupełniono statusy ocen dla {updated} odpowiedzi."))
@@ -0,0 +1,86 @@
+# WARSTWA ZAPYTAŃ STATUSÓW OCEN
+# Status odpowiedzi, oceny managera i oceny HR (pola utrzymywane na SurveyResponse - evaluations.rollups)
+# dołączane do list ankiet / pracowników adnotacjami zamiast osobnych zapytań dla każdego wiersza
+
+from django.db.models import F, OuterRef, Prefetch, Subquery, Window
+from django.db.models.functions import RowNumber
+
+from surveys.models import Survey, SurveyResponse
+
+
+def surveys_with_user_status(surveys, user):
+    # Jedno zapytanie: ankiety + pierwsza odpowiedź użytkownika + statusy ocen managera i HR
+    user_response = SurveyResponse.objects.filter(survey=OuterRef("pk"), user=user).order_by("pk")
+    return surveys.annotate(
+        response_id=Subquery(user_response.values("pk")[:1]),
+        response_status=Subquery(user_response.values("status")[:1]),
+        manager_eval_status=Subquery(user_response.values("manager_status")[:1]),
+        hr_eval_status=Subquery(user_response.values("hr_status")[:1]),
+    )
+
+
+def latest_surveys_by_department_role(pairs):
+    # Najnowsza ankieta dla każdej pary (dział, rola) - ankiety roli lub "both", jedno zapytanie
+    pairs = {(department_id, role) for department_id, role in pairs if department_id}
+    if not pairs:
+        return {}
+
+    rows = (
+        Survey.objects
+        .filter(
+            department_id__in={department_id for department_id, _ in pairs},
+            role__in={role for _, role in pairs} | {"both"},
+        )
+        .annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F("department_id"), F("role")],
+            order_by=[F("created_at").desc(), F("id").desc()],
+        ))
+        .filter(row_number=1)
+    )
+    latest = {(survey.department_id, survey.role): survey for survey in rows}
+
+    surveys = {}
+    for department_id, role in pairs:
+        candidates = [s for s in (latest.get((department_id, role)), latest.get((department_id, "both"))) if s]
+        if candidates:
+            surveys[(department_id, role)] = max(candidates, key=lambda s: (s.created_at, s.id))
+    return surveys
+
+
+def responses_with_status(pairs):
+    # Pierwsza odpowiedź dla każdej pary (użytkownik, ankieta) - statusy ocen managera i HR są polami odpowiedzi
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+
+    rows = (
+        SurveyResponse.objects
+        .filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            survey_id__in={survey_id for _, survey_id in pairs},
+        )
+        .order_by("pk")
+    )
+    responses = {}
+    for response in rows:
+        key = (response.user_id, response.survey_id)
+        if key in pairs:
+            responses.setdefault(key, response)
+    return responses
+
+
+def employee_survey_history(employee):
+    # Ankiety pracownika od daty zatrudnienia + jego odpowiedzi ze statusami ocen (prefetch)
+    # - dwa zapytania niezależnie od liczby ankiet
+    responses = SurveyResponse.objects.filter(user=employee).order_by("pk")
+    return (
+        Survey.objects
+        .filter(
+            department_id=employee.department_id,
+            role__in=[employee.role, "both"],
+            created_at__gte=employee.date_joined  # tylko ankiety po zatrudnieniu
+        )
+        .prefetch_related(Prefetch("surveyresponse_set", queryset=responses, to_attr="employee_responses"))
+        .order_by("-created_at")
+    )
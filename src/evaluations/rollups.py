@@ -0,0 +1,43 @@
+# UTRZYMANIE STATUSÓW OCEN NA SurveyResponse (manager_status, manager_submitted_at, hr_status, hr_completed_at)
+# Przeliczane jednym UPDATE z podzapytaniami w tej samej transakcji co zapis ocen managera / komentarza HR,
+# pełne uzupełnienie istniejących danych: manage.py backfill_status_rollups
+
+from django.db.models import Case, CharField, Exists, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Now
+
+from surveys.models import SurveyResponse
+from evaluations.models import EmployeeEvaluation, EmployeeEvaluationHR
+from reports.cache import bump_survey_versions_on_commit
+
+
+def refresh_status_rollups(responses, submitted_at=None):
+    # responses - queryset odpowiedzi; 'submitted' gdy wszystkie oceny managera wysłane, 'draft' gdy którakolwiek w trakcie.
+    # submitted_at - data wysłania dla odpowiedzi, które dopiero teraz przechodzą w 'submitted' (domyślnie teraz)
+    evaluations = EmployeeEvaluation.objects.filter(employee_response=OuterRef("pk"))
+    has_evaluation = Exists(evaluations)
+    has_draft = Exists(evaluations.filter(status="draft"))
+    hr_evaluation = EmployeeEvaluationHR.objects.filter(employee_response=OuterRef("pk"))
+
+    # UPDATE nie wysyła sygnałów - statusy ocen są widoczne w raportach, więc wersję ankiet podbijamy jawnie
+    bump_survey_versions_on_commit(responses.values_list("survey_id", flat=True).distinct())
+    return responses.update(
+        manager_status=Case(
+            When(has_draft, then=Value("draft")),
+            When(has_evaluation, then=Value("submitted")),
+            default=None,
+            output_field=CharField(),
+        ),
+        # data wysłania zostaje z pierwszego przejścia w 'submitted', kasowana gdy ocena wraca do roboczej
+        manager_submitted_at=Case(
+            When(has_draft, then=None),
+            When(has_evaluation, then=Coalesce("manager_submitted_at", submitted_at if submitted_at is not None else Now())),
+            default=None,
+        ),
+        hr_status=Subquery(hr_evaluation.values("status")[:1]),
+        hr_completed_at=Subquery(hr_evaluation.values("completed_at")[:1]),
+    )
+
+
+def refresh_response_status(response):
+    # Wywoływane wewnątrz transakcji zapisu ocen managera lub komentarza HR
+    return refresh_status_rollups(SurveyResponse.objects.filter(pk=response.pk))
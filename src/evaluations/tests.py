@@ -1,3 +1,102 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from evaluations.models import EmployeeEvaluation
+from evaluations.views import AUTOSAVE_SUMMARY_WINDOW
+from reports.models import ResponseScoreSummary
+from reports.summaries import rebuild_stale_summaries, refresh_response_summary
+from surveys.models import Competency, Question, Survey, SurveyAnswer, SurveyQuestion, SurveyResponse
+from users.models import CustomUser, Department
+
+
+class ManagerAutosaveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Sprzedaż")
+        cls.hr = CustomUser.objects.create_user("hr", password="pass", role="hr")
+        cls.manager = CustomUser.objects.create_user("manager", password="pass", role="manager", department=cls.department)
+        employee = CustomUser.objects.create_user("employee", password="pass", role="employee", department=cls.department)
+
+        competency = Competency.objects.create(name="Komunikacja")
+        cls.survey = Survey.objects.create(name="Ocena roczna", department=cls.department, role="employee")
+        cls.questions = [
+            Question.objects.create(text=f"Pytanie {i}", competency=competency, role="employee") for i in (1, 2)
+        ]
+        cls.text_question = Question.objects.create(text="Uwagi", type=Question.TEXT, role="employee")
+        for order, question in enumerate([*cls.questions, cls.text_question]):
+            SurveyQuestion.objects.create(survey=cls.survey, question=question, order=order)
+
+        cls.response = SurveyResponse.objects.create(survey=cls.survey, user=employee, status="submitted")
+        for question in cls.questions:
+            SurveyAnswer.objects.create(response=cls.response, question=question, scale_value=5)
+        SurveyAnswer.objects.create(response=cls.response, question=cls.text_question, text_value="Brak")
+        refresh_response_summary(cls.response)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def autosave(self, question, **data):
+        return self.client.post(reverse("manager_evaluate_autosave", args=[self.response.id, question.id]), data)
+
+    def autosave_scale(self, question, value):
+        return self.autosave(question, **{f"manager_scale_{question.id}": value})
+
+    def summary(self):
+        return ResponseScoreSummary.objects.get(response=self.response)
+
+    def test_autosaves_only_mark_summary_stale(self):
+        first, second = self.questions
+        self.assertEqual(self.autosave_scale(first, 4).status_code, 200)
+        self.assertEqual(self.autosave_scale(second, 8).status_code, 200)
+        self.assertEqual(self.autosave_scale(first, 6).status_code, 200)
+
+        summary = self.summary()
+        self.assertIsNotNone(summary.stale_at)
+        self.assertEqual(summary.manager_total, 0)
+
+    def test_report_read_rebuilds_stale_summary(self):
+        first, second = self.questions
+        self.autosave_scale(first, 4)
+        self.autosave_scale(second, 8)
+        self.autosave_scale(first, 6)
+
+        self.client.force_login(self.hr)
+        response = self.client.get(reverse("department_report_data"), {
+            "survey": self.survey.id, "department": self.department.id,
+        })
+        self.assertEqual(response.json()["chart_values"], [70.0])
+        summary = self.summary()
+        self.assertIsNone(summary.stale_at)
+        self.assertEqual(summary.manager_total, 6 + 8)
+        self.assertEqual(summary.manager_evaluations, 2)
+
+    def test_summary_rebuilt_after_quiet_window(self):
+        self.autosave_scale(self.questions[0], 4)
+        self.assertEqual(rebuild_stale_summaries(quiet_for=AUTOSAVE_SUMMARY_WINDOW), 0)
+
+        ResponseScoreSummary.objects.filter(response=self.response).update(
+            stale_at=timezone.now() - timedelta(seconds=AUTOSAVE_SUMMARY_WINDOW + 1)
+        )
+        self.assertEqual(rebuild_stale_summaries(quiet_for=AUTOSAVE_SUMMARY_WINDOW), 1)
+        self.assertEqual(self.summary().manager_total, 4)
+        self.assertIsNone(self.summary().stale_at)
+
+    def test_cleared_field_does_not_block_submission(self):
+        self.autosave(self.text_question, **{f"text_{self.text_question.id}": "Dobra praca"})
+        self.assertEqual(self.autosave(self.text_question, **{f"text_{self.text_question.id}": ""}).status_code, 200)
+        self.assertFalse(EmployeeEvaluation.objects.filter(question=self.text_question).exists())
+
+        self.client.post(reverse("manager_evaluate_employee", args=[self.response.id]), {
+            "save_type": "submitted",
+            **{f"manager_scale_{question.id}": 7 for question in self.questions},
+        })
 
-# Create your tests here.
+        self.response.refresh_from_db()
+        self.assertEqual(self.response.manager_status, "submitted")
+        self.assertFalse(EmployeeEvaluation.objects.filter(employee_response=self.response, status="draft").exists())
+        summary = self.summary()
+        self.assertIsNone(summary.stale_at)
+        self.assertEqual(summary.manager_total, 14)
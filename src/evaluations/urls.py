@@ -17,6 +17,8 @@ urlpatterns = [
     path('survey/<uuid:slug>/pdf/<int:user_id>/', SurveyPDFView.as_view(), name='survey_pdf'),
     # Ocena pracownika przez managera
     path('evaluate/<int:response_id>/', views.manager_evaluate_employee, name='manager_evaluate_employee'),
+    # Autozapis pojedynczego pytania oceny managera (HTMX)
+    path('evaluate/<int:response_id>/autosave/<int:question_id>/', views.manager_evaluate_autosave, name='manager_evaluate_autosave'),
     # Podgląd oceny pracownika przez managera
     path('manager/survey_overview/<int:response_id>/', views.manager_survey_overview, name='manager_survey_overview'),
     # PDF z podglądem oceny managera + wykresami
@@ -1,33 +1,41 @@
 # SEKCJA IMPORTÓW   
-import os
-import io
-import base64
 from functools import wraps
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import numpy as np
-
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.contrib.staticfiles.finders import find
+from django.core.paginator import Paginator
 from django.core.exceptions import PermissionDenied
 from django.utils import timezone
-from django.utils.text import slugify
+from django.views import View
+from django.views.decorators.http import require_POST
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.db import transaction
 from django.db.models import Q, Exists, OuterRef
 from django.contrib.auth import get_user_model
 
 from surveys.models import Survey, SurveyResponse, SurveyAnswer, Competency
+from surveys.rows import answer_rows
+from surveys.scoring import competency_scores
 from users.models import CustomUser
 from evaluations.models import EmployeeEvaluation, EmployeeEvaluationHR
-from wkhtmltopdf.views import PDFTemplateView
+from evaluations.queries import (
+    employee_survey_history, latest_surveys_by_department_role, responses_with_status, surveys_with_user_status,
+)
+from evaluations.rollups import refresh_response_status
+from reports.cache import bump_survey_versions_on_commit
+from reports.pdf import MANAGER_OVERVIEW
+from reports.pdf_jobs import pdf_response
+from reports.summaries import mark_response_summary_stale, rebuild_stale_summaries, refresh_response_summary
 
 
 # 1 ---- SEKCJA DEKORATORÓW I FUNKCJI POMOCNICZYCH
 
+EMPLOYEES_PAGE_SIZE = 50
+# Autozapis oceny managera: podsumowanie punktów przeliczane po tylu sekundach bez kolejnych zmian
+AUTOSAVE_SUMMARY_WINDOW = 30
+
 def hr_or_admin_required(view_func):
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
@@ -40,6 +48,8 @@ def employee_surveys_access_required(view_func):
     @wraps(view_func)
     def wrapper(request, user_id, *args, **kwargs):
         employee = get_object_or_404(CustomUser, pk=user_id)
+        # wczytany pracownik przekazywany do widoku - bez ponownego zapytania
+        kwargs["employee"] = employee
 
         # ✅ ADMIN / HR / SUPERUSER → wszystko
         if request.user.role in ['admin', 'hr'] or request.user.is_superuser:
@@ -47,13 +57,13 @@ def employee_surveys_access_required(view_func):
 
         # ✅ MANAGER → tylko swój dział
         if request.user.role == 'manager':
-            if employee.department == request.user.department:
+            if employee.department_id == request.user.department_id:
                 return view_func(request, user_id, *args, **kwargs)
             raise PermissionDenied
 
         # ✅ TEAM LEADER → tylko jego przypisani pracownicy
         if request.user.role == 'team_leader':
-            if employee.team_leader == request.user:
+            if employee.team_leader_id == request.user.id:
                 return view_func(request, user_id, *args, **kwargs)
             raise PermissionDenied
 
@@ -131,29 +141,18 @@ def home(request):
         else:
             department_surveys = Survey.objects.none()
 
-        for survey in department_surveys:
-            response = SurveyResponse.objects.filter(survey=survey, user=user).first()
-
+        # statusy odpowiedzi i ocen dołączone do ankiet w jednym zapytaniu
+        for survey in surveys_with_user_status(department_surveys, user):
+            response = None
             manager_eval_status = None
             hr_eval_status = None
             show_manager_overview = False
 
-            if response:
+            if survey.response_id:
+                response = SurveyResponse(id=survey.response_id, survey=survey, user=user, status=survey.response_status)
                 # ocena managera (również gdy ocenia admin!)
-                eval_qs = EmployeeEvaluation.objects.filter(employee_response=response)
-                if eval_qs.exists():
-                    statuses = eval_qs.values_list('status', flat=True)
-                    if all(s == 'submitted' for s in statuses):
-                        manager_eval_status = 'submitted'
-                    elif any(s == 'draft' for s in statuses):
-                        manager_eval_status = 'draft'
-
-                # ocena HR
-                try:
-                    hr_eval = EmployeeEvaluationHR.objects.get(employee_response=response)
-                    hr_eval_status = hr_eval.status
-                except EmployeeEvaluationHR.DoesNotExist:
-                    hr_eval_status = None
+                manager_eval_status = survey.manager_eval_status
+                hr_eval_status = survey.hr_eval_status
 
                 # pokazujemy overview tylko gdy obie oceny zakończone
                 show_manager_overview = (
@@ -210,45 +209,38 @@ def manager_employees(request):
 
     # ---------- SORTOWANIE ----------
     if sort == "department":
-        employees = employees.order_by("department__name", "last_name")
+        employees = employees.order_by("department__name", "last_name", "id")
     elif sort == "role":
-        employees = employees.order_by("role", "last_name")
+        employees = employees.order_by("role", "last_name", "id")
     else:
-        employees = employees.order_by("last_name")  # domyślne sortowanie
+        employees = employees.order_by("last_name", "id")  # domyślne sortowanie
+
+    # ---------- STRONICOWANIE (kolejne strony doładowywane przez HTMX) ----------
+    page_obj = Paginator(employees.select_related("department"), EMPLOYEES_PAGE_SIZE).get_page(request.GET.get("page"))
+    page_employees = list(page_obj)
+
     # ---------- LOGIKA ANKIET ----------
+    # najnowsza ankieta raz na parę (dział, rola), odpowiedzi i statusy ocen jednym zapytaniem dla całej strony
+    latest_surveys = latest_surveys_by_department_role((emp.department_id, emp.role) for emp in page_employees)
+    responses = responses_with_status(
+        (emp.id, latest_surveys[(emp.department_id, emp.role)].id)
+        for emp in page_employees
+        if (emp.department_id, emp.role) in latest_surveys
+    )
+
     employees_with_survey = []
-    for emp in employees:
-        latest_survey = Survey.objects.filter(
-            department=emp.department,
-            role__in=[emp.role, "both"]
-        ).order_by("-created_at").first()
+    for emp in page_employees:
+        latest_survey = latest_surveys.get((emp.department_id, emp.role))
 
         has_survey = False
         manager_status = None
         hr_status = None
 
-        if latest_survey:
-            latest_survey_response = SurveyResponse.objects.filter(
-                survey=latest_survey,
-                user=emp
-            ).first()
-
-            if latest_survey_response:
-                has_survey = latest_survey_response.status in ["submitted", "closed"]
-
-                manager_eval_qs = EmployeeEvaluation.objects.filter(employee_response=latest_survey_response)
-                if manager_eval_qs.exists():
-                    statuses = manager_eval_qs.values_list('status', flat=True)
-                    if all(s == 'submitted' for s in statuses):
-                        manager_status = 'submitted'
-                    elif any(s == 'draft' for s in statuses):
-                        manager_status = 'draft'
-
-                try:
-                    hr_eval = EmployeeEvaluationHR.objects.get(employee_response=latest_survey_response)
-                    hr_status = hr_eval.status
-                except EmployeeEvaluationHR.DoesNotExist:
-                    hr_status = None
+        latest_survey_response = responses.get((emp.id, latest_survey.id)) if latest_survey else None
+        if latest_survey_response:
+            has_survey = latest_survey_response.status in ["submitted", "closed"]
+            manager_status = latest_survey_response.manager_status
+            hr_status = latest_survey_response.hr_status
 
         employees_with_survey.append({
             "employee": emp,
@@ -258,49 +250,29 @@ def manager_employees(request):
             "latest_survey": latest_survey
         })
 
-    return render(request, "evaluations/manager_employees.html", {
+    context = {
         "employees_with_survey": employees_with_survey,
+        "page_obj": page_obj,
         "sort": sort
-    })
+    }
+    if request.headers.get("HX-Request"):
+        return render(request, "evaluations/_employee_rows.html", context)
+    return render(request, "evaluations/manager_employees.html", context)
 
 # LISTA ANKIET PRACOWNIKA z statusami ocen managera i HR (tutaj będą różne ankiety z różnych lat)
 @login_required
 @employee_surveys_access_required
-def employee_surveys(request, user_id):
-    employee = get_object_or_404(CustomUser, pk=user_id)
-    
-    # Filtrowanie ankiet po roli i po dacie zatrudnienia
-    surveys = Survey.objects.filter(
-        department=employee.department,
-        role__in=[employee.role, "both"],
-        created_at__gte=employee.date_joined  # tylko ankiety po zatrudnieniu
-    ).order_by("-created_at")
+def employee_surveys(request, user_id, employee):
+    # employee - pracownik wczytany już przez employee_surveys_access_required
 
     surveys_with_status = []
-    for survey in surveys:
-        try:
-            response = SurveyResponse.objects.get(survey=survey, user=employee)
-            has_survey = True
-        except SurveyResponse.DoesNotExist:
-            response = None
-            has_survey = False
-
-        # Status oceny managera
-        manager_eval_status = None
-        if response:
-            manager_eval = EmployeeEvaluation.objects.filter(employee_response=response).first()
-            if manager_eval:
-                manager_eval_status = manager_eval.status
-
-        # Status oceny HR
-        hr_eval_status = None
-        hr_eval = None
-        if response:
-            try:
-                hr_eval = EmployeeEvaluationHR.objects.get(employee_response=response)
-                hr_eval_status = hr_eval.status
-            except EmployeeEvaluationHR.DoesNotExist:
-                hr_eval_status = None
+    for survey in employee_survey_history(employee):
+        response = survey.employee_responses[0] if survey.employee_responses else None
+        has_survey = response is not None
+
+        # Statusy ocen managera i HR zapisane na odpowiedzi
+        manager_eval_status = response.manager_status if response else None
+        hr_eval_status = response.hr_status if response else None
 
         surveys_with_status.append({
             "survey": survey,
@@ -308,7 +280,6 @@ def employee_surveys(request, user_id):
             "response": response,
             "manager_eval_status": manager_eval_status,  # draft / submitted / None
             "hr_eval_status": hr_eval_status,          # draft / completed / None
-            "hr_eval": hr_eval,                        # obiekt HR jeśli istnieje
         })
 
     return render(request, "evaluations/employee_surveys.html", {
@@ -324,12 +295,12 @@ def manager_evaluate_employee(request, response_id):
     employee_response = get_object_or_404(SurveyResponse, id=response_id)
 
     # Pobranie pytań i ocen
-    employee_answers = SurveyAnswer.objects.filter(response=employee_response)
+    employee_answers = SurveyAnswer.objects.filter(response=employee_response).select_related("question")
     manager_evals = EmployeeEvaluation.objects.filter(
         employee_response=employee_response,
         manager=request.user
     )
-    manager_evals_dict = {e.question.id: e for e in manager_evals}
+    manager_evals_dict = {e.question_id: e for e in manager_evals}
     scale_choices = list(range(0, 11))  # 0-10
 
     if request.method == "POST":
@@ -340,7 +311,7 @@ def manager_evaluate_employee(request, response_id):
             missing_questions = []
             for ans in employee_answers:
                 if ans.scale_value is not None:  # pytanie punktowe
-                    scale_value = request.POST.get(f'manager_scale_{ans.question.id}')
+                    scale_value = request.POST.get(f'manager_scale_{ans.question_id}')
                     if not scale_value:
                         missing_questions.append(ans.question.text)
 
@@ -351,29 +322,47 @@ def manager_evaluate_employee(request, response_id):
                 )
                 return redirect(request.path)
 
-        # 🔹 Zapis ocen
+        # 🔹 Zapis ocen - jedno zapytanie upsert (unique_together) + status oceny na odpowiedzi w jednej transakcji
+        evaluations = {}
         for ans in employee_answers:
-            scale_value = request.POST.get(f'manager_scale_{ans.question.id}')
-            text_value = request.POST.get(f'text_{ans.question.id}', '')
+            scale_value = request.POST.get(f'manager_scale_{ans.question_id}')
+            text_value = request.POST.get(f'text_{ans.question_id}', '')
 
             if scale_value or text_value:
-                EmployeeEvaluation.objects.update_or_create(
+                evaluations[ans.question_id] = EmployeeEvaluation(
                     employee_response=employee_response,
-                    question=ans.question,
+                    question_id=ans.question_id,
                     manager=request.user,
-                    defaults={
-                        'scale_value': int(scale_value) if scale_value else None,
-                        'text_value': text_value,
-                        'status': save_type
-                    }
+                    scale_value=int(scale_value) if scale_value else None,
+                    text_value=text_value,
+                    status=save_type
                 )
 
+        with transaction.atomic():
+            EmployeeEvaluation.objects.bulk_create(
+                evaluations.values(),
+                update_conflicts=True,
+                unique_fields=["employee_response", "question", "manager"],
+                update_fields=["scale_value", "text_value", "status"],
+            )
+            # pola pozostawione puste nie trafiają do upsertu - wcześniejsze oceny managera dostają ten sam status,
+            # inaczej zostawałyby robocze mimo zakończenia oceny
+            EmployeeEvaluation.objects.filter(
+                employee_response=employee_response, manager=request.user
+            ).exclude(question_id__in=list(evaluations)).update(status=save_type)
+            # upsert nie wysyła post_save - cache raportów unieważniamy jawnie
+            bump_survey_versions_on_commit([employee_response.survey_id])
+            refresh_response_status(employee_response)
+
+        # 🔹 Przeliczenie podsumowania punktów do raportów
+        refresh_response_summary(employee_response)
+
         # 🔹 Przekierowanie po zapisaniu (draft i submitted w to samo miejsce)
         messages.success(
             request,
             "Oceny zostały zapisane." if save_type == "draft" else "Oceny zostały zakończone i zapisane."
         )
-        return redirect('employee_surveys', user_id=employee_response.user.id)
+        return redirect('employee_surveys', user_id=employee_response.user_id)
 
     # GET — renderowanie formularza
     context = {
@@ -384,6 +373,70 @@ def manager_evaluate_employee(request, response_id):
     }
     return render(request, 'evaluations/manager_evaluate.html', context)
 
+# AUTOZAPIS POJEDYNCZEGO PYTANIA OCENY MANAGERA (HTMX)
+@login_required
+@manager_or_privileged_access_required
+@require_POST
+def manager_evaluate_autosave(request, response_id, question_id):
+    employee_response = get_object_or_404(SurveyResponse, id=response_id)
+    # dekorator dopuszcza podgląd własnej ankiety - ocenić samego siebie nie można
+    if employee_response.user_id == request.user.id:
+        raise PermissionDenied
+    if not SurveyAnswer.objects.filter(response=employee_response, question_id=question_id).exists():
+        return HttpResponseBadRequest("Pytanie nie należy do tej ankiety.")
+
+    scale_value = request.POST.get(f'manager_scale_{question_id}')
+    text_value = request.POST.get(f'text_{question_id}', '')
+    try:
+        scale_value = int(scale_value) if scale_value else None
+    except ValueError:
+        return HttpResponseBadRequest("Nieprawidłowa ocena.")
+    if scale_value is not None and not 0 <= scale_value <= 10:
+        return HttpResponseBadRequest("Nieprawidłowa ocena.")
+
+    existing = EmployeeEvaluation.objects.filter(
+        employee_response=employee_response,
+        question_id=question_id,
+        manager=request.user
+    ).first()
+
+    # 🔹 Bez zmian (powtórzony lub spóźniony autozapis) albo puste pole bez oceny - nic nie zapisujemy
+    unchanged = existing and (existing.scale_value, existing.text_value) == (scale_value, text_value)
+    cleared = scale_value is None and not text_value
+    if unchanged or (not existing and cleared):
+        return HttpResponse(status=204)
+
+    with transaction.atomic():
+        if cleared:
+            # wyczyszczone pole - usuwamy ocenę, pusty wiersz roboczy blokowałby zakończenie oceny
+            existing.delete()
+        else:
+            EmployeeEvaluation.objects.bulk_create(
+                [EmployeeEvaluation(
+                    employee_response=employee_response,
+                    question_id=question_id,
+                    manager=request.user,
+                    scale_value=scale_value,
+                    text_value=text_value,
+                    status='draft'
+                )],
+                update_conflicts=True,
+                unique_fields=["employee_response", "question", "manager"],
+                update_fields=["scale_value", "text_value", "status"],
+            )
+        bump_survey_versions_on_commit([employee_response.survey_id])
+        # autozapis cofa ocenę do roboczej - status na odpowiedzi aktualizujemy tylko, gdy mógł się zmienić
+        if cleared or existing is None or existing.status != 'draft':
+            refresh_response_status(employee_response)
+
+    # 🔹 Okno łączenia zapisów - podsumowanie punktów tylko oznaczane jako nieaktualne; przeliczane raz,
+    #    gdy przez AUTOSAVE_SUMMARY_WINDOW s nie było zmian, przy pełnym zapisie formularza albo odczycie raportu
+    mark_response_summary_stale(employee_response)
+    # odpowiedzi, przy których autozapisy ucichły (manager przeszedł do kolejnego pracownika)
+    rebuild_stale_summaries(quiet_for=AUTOSAVE_SUMMARY_WINDOW)
+
+    return render(request, 'evaluations/_autosave_status.html', {'saved_at': timezone.localtime()})
+
 # PODGLĄD OCENY PRACOWNIKA PRZEZ MANAGERA
 @login_required
 @manager_or_privileged_access_required
@@ -401,26 +454,11 @@ def manager_survey_overview(request, response_id):
     # Kto oceniał
     manager_user = answers_manager.first().manager if answers_manager.exists() else None
 
-    # Wykres radarowy
-    radar_labels, radar_user_values, radar_manager_values = [], [], []
-    competencies = Competency.objects.all()
-    for comp in competencies:
-        comp_questions = survey.surveyquestion_set.filter(question__competency=comp)
-        if comp_questions.exists():
-            max_total = len(comp_questions) * 10
-            user_total = sum([
-                a.scale_value for a in answers_user
-                if a.question in [q.question for q in comp_questions] and a.scale_value is not None 
-            ])
-            manager_total = sum([
-                a.scale_value for a in answers_manager
-                if a.question in [q.question for q in comp_questions] and a.scale_value is not None
-            ])
-            radar_labels.append(comp.name)
-            radar_user_values.append(round(user_total / max_total * 100, 2) if max_total else 0)
-            radar_manager_values.append(round(manager_total / max_total * 100, 2) if max_total else 0)
+    # Wykres radarowy - indeks kompetencji ankiety budowany raz, punktacja po question_id
+    radar_labels, radar_user_values, radar_manager_values = competency_scores(survey, answers_user, answers_manager)
 
     radar_data = list(zip(radar_labels, radar_user_values, radar_manager_values))
+    rows = answer_rows(survey, answers_user, answers_manager)
     scale_range = range(0, 11)
 
     # Suma punktów managera
@@ -446,8 +484,7 @@ def manager_survey_overview(request, response_id):
     return render(request, 'evaluations/manager_survey_overview.html', {
         "survey": survey,
         "viewed_user": viewed_user,
-        "answers_user": answers_user,
-        "answers_manager": answers_manager,
+        "rows": rows,
         "radar_labels": radar_labels,
         "radar_user_values": radar_user_values,
         "radar_manager_values": radar_manager_values,
@@ -466,15 +503,8 @@ def manager_survey_overview(request, response_id):
 CustomUser = get_user_model()
 
 # PDF Z PODGLĄDEM OCENY MANAGERA + WYKRESY
-class ManagerSurveyOverviewPDFView(LoginRequiredMixin, PDFTemplateView):
-    template_name = "evaluations/manager_survey_overview_pdf.html"
-
-    cmd_options = {
-        'footer-right': 'Strona [page] z [topage]',
-        'footer-font-size': '8',
-        'footer-spacing': '5',
-        'margin-bottom': '15mm',
-    }
+# Gotowy plik z dysku albo zlecenie dla manage.py pdf_worker (reports.pdf_jobs) - żądanie nie czeka na wkhtmltopdf
+class ManagerSurveyOverviewPDFView(LoginRequiredMixin, View):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.role not in ['manager', 'team_leader', 'hr', 'admin'] and not request.user.is_superuser:
@@ -482,131 +512,11 @@ class ManagerSurveyOverviewPDFView(LoginRequiredMixin, PDFTemplateView):
         return super().dispatch(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
-        response = super().get(request, *args, **kwargs)
-        
-        # Pobranie obiektu odpowiedzi
-        survey_response = self.get_response()
-        survey_name = slugify(survey_response.survey.name)
-        user_full_name = slugify(survey_response.user.get_full_name())
-
-        filename = f"{survey_name}_{user_full_name}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['Content-Type'] = 'application/pdf'
-        return response
-
+        return pdf_response(request, MANAGER_OVERVIEW, self.get_response())
 
     def get_response(self):
         response_id = self.kwargs.get("response_id")
-        return get_object_or_404(SurveyResponse, pk=response_id)
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        response = self.get_response()
-
-        # Odpowiedzi pracownika i managera
-        answers_user = response.answers.all()
-        answers_manager = EmployeeEvaluation.objects.filter(employee_response=response)
-
-        # Wyliczenie kompetencji
-        labels, user_values, manager_values = [], [], []
-        competencies = response.survey.questions.values_list("competency__name", flat=True).distinct()
-        competencies = [c for c in competencies if c]
-
-        for comp_name in competencies:
-            comp_questions = response.survey.questions.filter(competency__name=comp_name)
-            max_total = comp_questions.count() * 10
-            user_total = sum(a.scale_value for a in answers_user if a.question in comp_questions and a.scale_value is not None)
-            manager_total = sum(a.scale_value for a in answers_manager if a.question in comp_questions and a.scale_value is not None)
-            labels.append(comp_name)
-            user_values.append(round(user_total / max_total * 100, 2) if max_total else 0)
-            manager_values.append(round(manager_total / max_total * 100, 2) if max_total else 0)
-
-            if len(labels) >= 3:
-                radar_image = self._generate_radar_chart_user_manager(labels, user_values, manager_values)
-                show_radar = True
-            else:
-                radar_image = None
-                show_radar = False
-
-        radar_data = list(zip(labels, user_values, manager_values))
-
-        # START: POPRAWIONE POBRANIE LOGO JAKO BASE64
-        logo_base64 = None
-        logo_path = find("ats.jpg")
-        if logo_path and os.path.exists(logo_path):
-            try:
-                with open(logo_path, "rb") as f:
-                    logo_base64 = base64.b64encode(f.read()).decode("utf-8")
-            except Exception as e:
-                print(f"Błąd podczas kodowania logo do base64: {e}")
-        else:
-            print("NIE ZNALEZIONO LOGO: ats.jpg nie znaleziono w ścieżkach statycznych!")
-        # KONIEC: POPRAWIONE POBRANIE LOGO JAKO BASE64
-
-        # 🔹 SUMA PUNKTÓW – tylko oceny managera
-        manager_scored = [a.scale_value for a in answers_manager if a.scale_value is not None]
-        manager_total_points = sum(manager_scored)
-        manager_max_points = len(manager_scored) * 10 if manager_scored else 0
-        manager_percentage = round((manager_total_points / manager_max_points) * 100, 2) if manager_max_points else 0
-
-        context.update({
-            "response": response,
-            "answers_user": answers_user,
-            "answers_manager": answers_manager,
-            "radar_image": radar_image,
-            "radar_data": radar_data,
-            "show_radar": True,
-            "scale_range": range(0, 11),
-            "logo_base64": logo_base64,
-            "manager_total_points": manager_total_points,
-            "manager_max_points": manager_max_points,
-            "manager_percentage": manager_percentage,
-        })
-        return context
-
-    def _generate_radar_chart_user_manager(self, labels, user_values, manager_values):
-        if not labels:
-            return None
-
-        N = len(labels)
-        angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
-        angles_closed = angles + [angles[0]]
-        user_values_closed = user_values + [user_values[0]]
-        manager_values_closed = manager_values + [manager_values[0]] if manager_values else None
-
-        fig, ax = plt.subplots(figsize=(7,7), subplot_kw=dict(polar=True))  # większy wykres
-        ax.set_theta_offset(np.pi / 2)
-        ax.set_theta_direction(-1)
-        ax.set_xticks(angles)
-        ax.set_xticklabels(labels, fontsize=12)
-        ax.set_ylim(0, 100)
-        ax.set_yticks(range(0, 101, 10))  # linie co 10%
-        ax.set_rlabel_position(0)
-        ax.yaxis.grid(True, linestyle='--', linewidth=0.5)  # poziome linie pomocnicze
-        ax.xaxis.grid(False) 
-
-        # Linie siatki
-        for angle in angles:
-            ax.plot([angle, angle], [0, 100], color='gray', linestyle='dashed', linewidth=0.5)
-
-        # Wartości pracownika
-        ax.plot(angles_closed, user_values_closed, color='#0d6efd', linewidth=2.5, label='Pracownik')  # niebieski
-        ax.fill(angles_closed, user_values_closed, '#0d6efd', alpha=0.15)
-
-        # Wartości managera
-        if manager_values_closed:
-            ax.plot(angles_closed, manager_values_closed, color='#000000', linewidth=2.5, label='Manager')  # czarny
-            ax.fill(angles_closed, manager_values_closed, '#000000', alpha=0.15)
-
-        # Legenda większa i czytelna
-        ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize=12, frameon=False)
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close(fig)
-        return img_base64
+        return get_object_or_404(SurveyResponse.objects.select_related("survey", "user__department"), pk=response_id)
 
 # KOMENTARZ HR DO OCENY PRACOWNIKA I MANAGERA
 # Po zakończeniu oceny managera, HR może dodać swój komentarz do oceny pracownika i dopiero wtedy pracownik zobaczy pełną ocenę
@@ -626,22 +536,27 @@ def hr_comment_employee(request, response_id):
     answers_manager = EmployeeEvaluation.objects.filter(employee_response=response)
 
     # Pobranie lub utworzenie komentarza HR
-    hr_eval, created = EmployeeEvaluationHR.objects.get_or_create(employee_response=response)
+    with transaction.atomic():
+        hr_eval, created = EmployeeEvaluationHR.objects.get_or_create(employee_response=response)
+        if created:
+            refresh_response_status(response)
 
     if request.method == 'POST':
         hr_comment = request.POST.get('hr_comment', '').strip()
         hr_eval.comment = hr_comment
 
         action = request.POST.get('action')
-        if action == 'draft':
-            hr_eval.status = 'draft'
-            hr_eval.completed_at = None
-            messages.success(request, "Komentarz HR został zapisany jako roboczy.")
-        elif action == 'completed':
-            hr_eval.mark_completed(user=request.user)
-            messages.success(request, "Komentarz HR został zapisany i wysłany do pracownika.")
-
-        hr_eval.save()
+        with transaction.atomic():
+            if action == 'draft':
+                hr_eval.status = 'draft'
+                hr_eval.completed_at = None
+                messages.success(request, "Komentarz HR został zapisany jako roboczy.")
+            elif action == 'completed':
+                hr_eval.mark_completed(user=request.user)
+                messages.success(request, "Komentarz HR został zapisany i wysłany do pracownika.")
+
+            hr_eval.save()
+            refresh_response_status(response)
         return redirect('employee_surveys', user_id=viewed_user.id)
 
     scale_range = range(0, 11)
@@ -649,8 +564,7 @@ def hr_comment_employee(request, response_id):
     context = {
         'survey': survey,
         'viewed_user': viewed_user,
-        'answers_user': answers_user,
-        'answers_manager': answers_manager,
+        'rows': answer_rows(survey, answers_user, answers_manager),
         'scale_range': scale_range,
         'hr_comment': hr_eval.comment,
         'manager_user': answers_manager.first().manager if answers_manager.exists() else None,
@@ -0,0 +1,257 @@
+# BENCHMARK RAPORTÓW I PANELI
+# Dla każdej wielkości organizacji: świeża baza testowa + seed_org, następnie pomiar czasu
+# (pierwsze wywołanie bez cache i mediana kolejnych) oraz liczby zapytań każdego widoku.
+# Osobno: start workera WSGI (czas importu i pamięć RSS) - run_startup_benchmark.
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys.models import Survey, SurveyResponse
+from users.models import CustomUser
+
+from .cache import bump_survey_version
+from .seeding import seed_org
+
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+
+def benchmark_cases(prefix="seed"):
+    # (nazwa, login użytkownika, url) - próbka: pierwszy dział i jego pracownik z wysłaną ankietą
+    admin = CustomUser.objects.get(username=f"{prefix}_admin")
+    hr = CustomUser.objects.get(username=f"{prefix}_hr")
+    survey = (
+        Survey.objects
+        .filter(department__name__startswith=f"{prefix} ", role="employee")
+        .order_by("department__name", "-year")
+        .first()
+    )
+    department_id = survey.department_id
+    manager = CustomUser.objects.get(department_id=department_id, role="manager")
+    response = (
+        SurveyResponse.objects
+        .filter(survey=survey, status="submitted")
+        .select_related("user")
+        .order_by("id")
+        .first()
+    )
+    employee = response.user
+
+    department_params = f"?department={department_id}&year={survey.year}&survey={survey.id}"
+    return [
+        ("home.employee", employee, reverse("home")),
+        ("home.manager", manager, reverse("home")),
+        ("manager_employees.manager", manager, reverse("manager_employees")),
+        ("manager_employees.hr", hr, reverse("manager_employees")),
+        ("employee_surveys", manager, reverse("employee_surveys", args=[employee.id])),
+        ("manager_survey_overview", manager, reverse("manager_survey_overview", args=[response.id])),
+        ("reports_home", hr, reverse("reports_home")),
+        ("department_report", hr, reverse("department_report") + department_params),
+        ("department_report_data", hr, reverse("department_report_data") + department_params),
+        ("department_radar_data.employee", hr, reverse("department_radar_report_data") + department_params + "&score_type=employee"),
+        ("department_radar_data.manager", hr, reverse("department_radar_report_data") + department_params + "&score_type=manager"),
+        ("employee_report_data", hr, reverse("employee_report_data") + f"?employee={employee.id}"),
+        ("employee_trend", hr, reverse("employee_trend", args=[employee.id])),
+        ("latest_survey_report_data", hr, reverse("latest_survey_report_data") + f"?year={survey.year}"),
+        ("ranking_report", admin, reverse("ranking_report") + f"?year={survey.year}"),
+        ("export_results_csv", admin, reverse("export_results_csv") + f"?survey={survey.id}"),
+    ]
+
+
+def _invalidate_reports():
+    # Podbicie wersji wszystkich ankiet = pomiar "na zimno" bez czyszczenia całego cache
+    for survey_id in Survey.objects.values_list("id", flat=True):
+        bump_survey_version(survey_id)
+
+
+def _get(client, url):
+    response = client.get(url)
+    # odpowiedzi strumieniowe (eksport) są liczone razem z wygenerowaniem całej treści
+    body = b"".join(response.streaming_content) if response.streaming else response.content
+    return response.status_code, len(body)
+
+
+class QueryCounter:
+    # execute_wrapper - liczy zapytania niezależnie od reset_queries() wywoływanego na starcie żądania
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure_view(client, url, repeat=5):
+    _invalidate_reports()
+    start = perf_counter()
+    status, size = _get(client, url)
+    cold = perf_counter() - start
+
+    _invalidate_reports()
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        _get(client, url)
+
+    warm = []
+    for _ in range(repeat):
+        start = perf_counter()
+        _get(client, url)
+        warm.append(perf_counter() - start)
+
+    return {
+        "status": status,
+        "bytes": size,
+        "queries": queries.count,
+        "cold_ms": round(cold * 1000, 2),
+        "warm_ms": round(statistics.median(warm) * 1000, 2) if warm else None,
+    }
+
+
+def run_size(employees, repeat=5, seed=0, prefix="seed", log=None):
+    start = perf_counter()
+    counts = seed_org(employees=employees, seed=seed, prefix=prefix)
+    seed_seconds = perf_counter() - start
+    if log:
+        log(f"[{employees}] dane wygenerowane w {seed_seconds:.1f} s")
+
+    clients, views = {}, {}
+    for name, user, url in benchmark_cases(prefix):
+        if user.id not in clients:
+            clients[user.id] = Client()
+            clients[user.id].force_login(user)
+        views[name] = measure_view(clients[user.id], url, repeat)
+        if log:
+            result = views[name]
+            log(f"[{employees}] {name}: {result['queries']} zapytań, {result['cold_ms']} ms / {result['warm_ms']} ms")
+
+    counts.pop("admin"), counts.pop("hr")
+    return {"data": counts, "seed_seconds": round(seed_seconds, 2), "views": views}
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, repeat=5, seed=0, prefix="seed", log=None):
+    # Pomiary na osobnej bazie testowej (czyszczonej przed każdą wielkością) - dane produkcyjne nie są dotykane
+    results = {}
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        for employees in sizes:
+            call_command("flush", interactive=False, verbosity=0)
+            results[str(employees)] = run_size(employees, repeat, seed, prefix, log)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    return {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline, current):
+    # Wiersze (wielkość, widok, zapytania przed/po, mediana ms przed/po, zmiana %)
+    rows = []
+    for size, result in current["results"].items():
+        base_views = baseline.get("results", {}).get(size, {}).get("views", {})
+        for name, view in result["views"].items():
+            base = base_views.get(name)
+            if not base:
+                continue
+            change = None
+            if base["warm_ms"] and view["warm_ms"] is not None:
+                change = round((view["warm_ms"] - base["warm_ms"]) / base["warm_ms"] * 100, 1)
+            rows.append((size, name, base["queries"], view["queries"], base["warm_ms"], view["warm_ms"], change))
+    return rows
+
+
+# START WORKERA WSGI
+# Każdy pomiar w nowym procesie Pythona: django.setup() + aplikacja WSGI + import wszystkich widoków z urls.
+# Wariant "eager" dodatkowo importuje moduły wykresów matplotlib - tak startował worker przed leniwym importem.
+
+STARTUP_VARIANTS = {
+    "lazy": [],
+    "eager": ["reports.charts"],
+}
+
+STARTUP_MODULES = ["matplotlib", "matplotlib.pyplot", "numpy"]
+
+STARTUP_SCRIPT = """
+import importlib, json, sys
+from time import perf_counter
+
+start = perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+for module in sys.argv[1:]:
+    importlib.import_module(module)
+elapsed = perf_counter() - start
+
+rss_kb = None
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+except (OSError, StopIteration):
+    try:
+        import resource
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            rss_kb //= 1024
+    except ImportError:
+        pass
+
+print(json.dumps({"seconds": elapsed, "rss_kb": rss_kb, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_startup(modules=(), python=None):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    result = subprocess.run(
+        [python or sys.executable, "-c", STARTUP_SCRIPT, *modules],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_startup_benchmark(repeat=5, log=None):
+    # Mediana czasu importu i RSS dla każdego wariantu + które moduły wykresów zostały załadowane
+    results = {}
+    for variant, modules in STARTUP_VARIANTS.items():
+        runs = [measure_startup(modules) for _ in range(repeat)]
+        rss = [run["rss_kb"] for run in runs if run["rss_kb"] is not None]
+        results[variant] = {
+            "import_ms": round(statistics.median(run["seconds"] for run in runs) * 1000, 1),
+            "rss_mb": round(statistics.median(rss) / 1024, 1) if rss else None,
+            "loaded": [module for module in STARTUP_MODULES if module in runs[0]["modules"]],
+        }
+        if log:
+            result = results[variant]
+            log(f"{variant}: {result['import_ms']} ms, {result['rss_mb']} MB, załadowane: {', '.join(result['loaded']) or '-'}")
+
+    return {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "django": django.get_version(),
+            "python": sys.version.split()[0],
+            "repeat": repeat,
+        },
+        "results": results,
+    }
@@ -0,0 +1,72 @@
+# CACHE RAPORTÓW
+# Klucz = (typ raportu, ankieta, dział, typ oceny) + numer wersji ankiety.
+# Wersja jest podbijana sygnałami (reports.signals) przy każdej zmianie odpowiedzi / ocen,
+# więc stare wpisy przestają być odczytywane i wygasają same.
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+GLOBAL_SCOPE = "all"
+
+
+def get_cache():
+    return caches[getattr(settings, "REPORTS_CACHE_ALIAS", "default")]
+
+
+def _version_key(survey_id):
+    return f"reports:version:{survey_id or GLOBAL_SCOPE}"
+
+
+def survey_version(survey_id=None):
+    cache = get_cache()
+    key = _version_key(survey_id)
+    # add() nie nadpisuje istniejącej wersji
+    cache.add(key, 1, timeout=None)
+    return cache.get(key, 1)
+
+
+def bump_survey_version(survey_id):
+    # Podbija wersję ankiety oraz wersję globalną (raporty obejmujące wiele ankiet)
+    cache = get_cache()
+    for key in {_version_key(survey_id), _version_key(None)}:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+def bump_survey_versions_on_commit(survey_ids):
+    # Zapisy z pominięciem sygnałów (bulk_create z upsertem, queryset.update()) podbijają wersję jawnie -
+    # po zatwierdzeniu transakcji, aby równoległe żądanie nie zapisało w cache danych sprzed zmiany
+    survey_ids = {survey_id for survey_id in survey_ids if survey_id}
+
+    def bump():
+        for survey_id in survey_ids:
+            bump_survey_version(survey_id)
+
+    transaction.on_commit(bump)
+
+
+def report_cache_key(report_type, survey_id=None, department_id=None, score_type=None, extra=None):
+    # extra - dodatkowy wyróżnik raportów niezwiązanych z jedną ankietą (np. pracownik, rok)
+    return "reports:{}:{}:{}:{}:{}:v{}".format(
+        report_type,
+        survey_id or "-",
+        department_id or "-",
+        score_type or "-",
+        extra or "-",
+        survey_version(survey_id),
+    )
+
+
+def cached_report(report_type, build, survey_id=None, department_id=None, score_type=None, extra=None):
+    # Zwraca dane raportu z cache lub buduje je funkcją build() i zapisuje
+    cache = get_cache()
+    key = report_cache_key(report_type, survey_id, department_id, score_type, extra)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout=getattr(settings, "REPORTS_CACHE_TIMEOUT", 60 * 60 * 24))
+    return data
@@ -0,0 +1,80 @@
+# CACHE WYKRESÓW RADAROWYCH DO PDF
+# Klucz = skrót (typ wykresu, wersja stylu, etykiety, wartości) - ten sam wykres nie jest rysowany drugi raz.
+# Najpierw LRU w pamięci procesu, potem pliki na dysku (wspólne dla widoków i procesów pdf_worker).
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+
+
+# Podbić przy każdej zmianie wyglądu wykresów - stare wpisy przestają być odczytywane
+CHART_STYLE_VERSION = 2
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+def chart_cache_dir():
+    return Path(getattr(settings, "CHART_CACHE_DIR", Path(settings.PDF_CACHE_DIR) / "charts"))
+
+
+def chart_key(chart_type, labels, *series):
+    payload = json.dumps([chart_type, CHART_STYLE_VERSION, list(labels), [list(s) if s else None for s in series]], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _chart_path(key):
+    return chart_cache_dir() / key[:2] / f"{key}.txt"
+
+
+def _remember(key, chart):
+    with _lock:
+        _memory[key] = chart
+        _memory.move_to_end(key)
+        while len(_memory) > getattr(settings, "CHART_CACHE_MEMORY_ITEMS", 256):
+            _memory.popitem(last=False)
+
+
+def _read(key):
+    try:
+        return _chart_path(key).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _write(key, chart):
+    # Zapis przez plik tymczasowy + os.replace - inny proces nigdy nie odczyta niepełnego wykresu
+    path = _chart_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(chart, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        # brak miejsca / uprawnień - wykres i tak zostaje w pamięci procesu
+        pass
+
+
+def cached_chart(chart_type, build, labels, *series):
+    # build() rysuje wykres (np. PNG w base64) tylko wtedy, gdy nie ma go w pamięci ani na dysku
+    key = chart_key(chart_type, labels, *series)
+    with _lock:
+        chart = _memory.get(key)
+        if chart is not None:
+            _memory.move_to_end(key)
+            return chart
+
+    chart = _read(key)
+    if chart is None:
+        chart = build()
+        if chart is None:
+            return None
+        _write(key, chart)
+    _remember(key, chart)
+    return chart
+
@@ -0,0 +1,80 @@
+# WYKRESY RADAROWE PNG (matplotlib)
+# Importowany leniwie przez reports.pdf (PDF_CHART_RENDERER = "matplotlib") - przy starcie aplikacji
+# nie ładujemy matplotlib, pyplot ani numpy.
+
+import base64
+import io
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+
+def radar_chart_png(labels, values):
+    N = len(labels)
+    angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
+    angles_closed = angles + [angles[0]]
+    values_closed = values + [values[0]]
+
+    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
+    ax.set_theta_offset(np.pi / 2)
+    ax.set_theta_direction(-1)
+    ax.set_xticks(angles)
+    ax.set_xticklabels(labels)
+    ax.set_ylim(0, 100)
+    ax.set_rlabel_position(0)
+    ax.grid(True)
+    ax.set_title("WYKRES KOMPETENCJI", va='bottom', fontsize=14, fontweight='bold', pad=34)
+
+    ax.plot(angles_closed, values_closed, linewidth=2, linestyle='solid', color='blue')
+    ax.fill(angles_closed, values_closed, 'blue', alpha=0.1)
+
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', bbox_inches='tight')
+    buf.seek(0)
+    image_base64 = base64.b64encode(buf.read()).decode('utf-8')
+    plt.close(fig)
+    return f"data:image/png;base64,{image_base64}"
+
+
+def user_manager_radar_chart_png(labels, user_values, manager_values):
+    N = len(labels)
+    angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
+    angles_closed = angles + [angles[0]]
+    user_values_closed = user_values + [user_values[0]]
+    manager_values_closed = manager_values + [manager_values[0]] if manager_values else None
+
+    fig, ax = plt.subplots(figsize=(7,7), subplot_kw=dict(polar=True))  # większy wykres
+    ax.set_theta_offset(np.pi / 2)
+    ax.set_theta_direction(-1)
+    ax.set_xticks(angles)
+    ax.set_xticklabels(labels, fontsize=12)
+    ax.set_ylim(0, 100)
+    ax.set_yticks(range(0, 101, 10))  # linie co 10%
+    ax.set_rlabel_position(0)
+    ax.yaxis.grid(True, linestyle='--', linewidth=0.5)  # poziome linie pomocnicze
+    ax.xaxis.grid(False)
+
+    # Linie siatki
+    for angle in angles:
+        ax.plot([angle, angle], [0, 100], color='gray', linestyle='dashed', linewidth=0.5)
+
+    # Wartości pracownika
+    ax.plot(angles_closed, user_values_closed, color='#0d6efd', linewidth=2.5, label='Pracownik')  # niebieski
+    ax.fill(angles_closed, user_values_closed, '#0d6efd', alpha=0.15)
+
+    # Wartości managera
+    if manager_values_closed:
+        ax.plot(angles_closed, manager_values_closed, color='#000000', linewidth=2.5, label='Manager')  # czarny
+        ax.fill(angles_closed, manager_values_closed, '#000000', alpha=0.15)
+
+    # Legenda większa i czytelna
+    ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize=12, frameon=False)
+
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', bbox_inches='tight')
+    buf.seek(0)
+    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
+    plt.close(fig)
+    return f"data:image/png;base64,{img_base64}"
@@ -0,0 +1,89 @@
+# DANE WYKRESÓW RAPORTÓW
+# Każda funkcja zwraca słownik gotowy do szablonu, buforowany w cache raportów (reports.cache)
+# Przed budowaniem danych przeliczane są podsumowania oznaczone przez autozapis ocen (autozapis podbija
+# wersję ankiety, więc nieaktualne podsumowanie zawsze oznacza budowanie danych od nowa)
+
+from surveys.models import Survey, SurveyResponse
+
+from .cache import cached_report
+from .queries import department_manager_scores, latest_survey_manager_scores
+from .scoring import department_radar_scores
+from .summaries import rebuild_stale_summaries
+
+
+def department_chart(survey, department):
+    def build():
+        rebuild_stale_summaries(response__survey_id=survey.id)
+        chart_labels, chart_values = [], []
+        for score in department_manager_scores(survey, department):
+            chart_labels.append(f"{score['first_name']} {score['last_name']}")
+            chart_values.append(score["manager_percentage"])
+
+        if chart_labels:
+            chart_data = sorted(zip(chart_labels, chart_values), key=lambda x: x[1], reverse=True)
+            chart_labels, chart_values = zip(*chart_data)
+            chart_labels = list(chart_labels)
+            chart_values = list(chart_values)
+
+        return {"chart_labels": chart_labels, "chart_values": chart_values}
+
+    return cached_report("department", build, survey_id=survey.id, department_id=department.id)
+
+
+def department_radar(survey, department_id, score_type):
+    def build():
+        rebuild_stale_summaries(response__survey_id=survey.id)
+        # Pobierz wszystkich pracowników, którzy wzięli udział w ankiecie
+        responses = SurveyResponse.objects.filter(
+            survey=survey,
+            user__department_id=department_id,
+            status="submitted"
+        ).select_related("user").order_by("id")
+
+        # Macierz wyników kompetencji + średnia działu
+        radar_labels, radar_data, avg_scores = department_radar_scores(survey, responses, score_type)
+        return {"radar_labels": radar_labels, "radar_data": radar_data, "avg_scores": avg_scores}
+
+    return cached_report(
+        "department_radar", build, survey_id=survey.id, department_id=department_id, score_type=score_type
+    )
+
+
+def employee_chart(employee):
+    def build():
+        rebuild_stale_summaries(response__user=employee)
+        chart_labels, chart_values = [], []
+
+        # pobierz wszystkie wypełnione ankiety pracownika, od najnowszej do najstarszej
+        # tylko ankiety z oceną managera - wynik z tabeli podsumowań
+        responses = (
+            SurveyResponse.objects
+            .filter(user=employee, status="submitted", score_summary__manager_evaluations__gt=0)
+            .select_related('survey', 'score_summary')
+            .order_by('-created_at')
+        )
+
+        for response in responses:
+            # zamiast daty dodajemy nazwę ankiety
+            chart_labels.append(response.survey.name)
+            chart_values.append(response.score_summary.manager_percentage)
+
+        return {"chart_labels": chart_labels, "chart_values": chart_values}
+
+    return cached_report("employee", build, extra=employee.id)
+
+
+def latest_survey_chart(year=None):
+    def build():
+        rebuild_stale_summaries(**({"response__survey__year": year} if year else {}))
+        departments, scores = latest_survey_manager_scores(year)
+
+        # 🔹 sortowanie od najwyższej do najniższej oceny
+        scores.sort(key=lambda row: (row["manager_score"], row["label"]), reverse=True)
+        return {
+            "chart_labels": [row["label"] for row in scores],
+            "manager_scores": [row["manager_score"] for row in scores],
+            "departments_checked": [f"{dept['department_name']} ({dept['survey_name']})" for dept in departments],
+        }
+
+    return cached_report("latest_survey", build, extra=year)
@@ -0,0 +1,127 @@
+# EKSPORT WYNIKÓW ANKIET (CSV / XLSX)
+# Wiersze generowane partiami odpowiedzi - pamięć nie rośnie z rozmiarem eksportu
+
+import csv
+import tempfile
+
+from evaluations.models import EmployeeEvaluation
+from surveys.models import SurveyAnswer, SurveyResponse
+
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_HEADER = [
+    "Pracownik", "Login", "Dział", "Ankieta", "Rok", "Status ankiety",
+    "Pytanie", "Kompetencja", "Ocena pracownika", "Odpowiedź pracownika",
+    "Manager", "Ocena managera", "Komentarz managera", "Komentarz HR",
+]
+
+
+def export_responses(survey_id=None, year=None):
+    responses = SurveyResponse.objects.all()
+    if survey_id:
+        responses = responses.filter(survey_id=survey_id)
+    if year:
+        responses = responses.filter(survey__year=year)
+    return responses
+
+
+def _batch_rows(batch):
+    # Odpowiedzi i oceny managera dla jednej partii - dwa zapytania na partię
+    response_ids = [response.id for response in batch]
+
+    evaluations = {}
+    evaluation_rows = (
+        EmployeeEvaluation.objects
+        .filter(employee_response_id__in=response_ids)
+        .order_by("id")
+        .values_list(
+            "employee_response_id", "question_id", "scale_value", "text_value",
+            "manager__first_name", "manager__last_name",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for response_id, question_id, scale_value, text_value, first_name, last_name in evaluation_rows:
+        evaluations.setdefault((response_id, question_id), []).append(
+            (f"{first_name} {last_name}".strip(), scale_value, text_value)
+        )
+
+    responses = {response.id: response for response in batch}
+    answers = (
+        SurveyAnswer.objects
+        .filter(response_id__in=response_ids)
+        .order_by("response_id", "id")
+        .values_list("response_id", "question_id", "question__text", "question__competency__name", "scale_value", "text_value")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for response_id, question_id, question_text, competency_name, scale_value, text_value in answers:
+        response = responses[response_id]
+        user = response.user
+        hr_evaluation = getattr(response, "hr_evaluation", None)
+        base = [
+            user.get_full_name(),
+            user.username,
+            user.department.name if user.department else "",
+            response.survey.name,
+            response.survey.year,
+            response.get_status_display(),
+            question_text,
+            competency_name or "",
+            scale_value,
+            text_value,
+        ]
+        hr_comment = hr_evaluation.comment if hr_evaluation else response.hr_comment
+        for manager_name, manager_scale, manager_text in evaluations.get((response_id, question_id), [("", None, "")]):
+            yield base + [manager_name, manager_scale, manager_text, hr_comment]
+
+
+def export_rows(responses, chunk_size=EXPORT_CHUNK_SIZE):
+    # Nagłówek + wiersz dla każdej pary (odpowiedź na pytanie, ocena managera)
+    yield EXPORT_HEADER
+
+    batch = []
+    responses = (
+        responses
+        .select_related("user__department", "survey", "hr_evaluation")
+        .order_by("survey__year", "survey_id", "user__last_name", "user__first_name", "id")
+        .iterator(chunk_size=chunk_size)
+    )
+    for response in responses:
+        batch.append(response)
+        if len(batch) >= chunk_size:
+            yield from _batch_rows(batch)
+            batch = []
+    if batch:
+        yield from _batch_rows(batch)
+
+
+class Echo:
+    # Pseudo-bufor dla csv.writer - zwraca zapisany wiersz zamiast go przechowywać
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows):
+    # BOM + średnik, aby Excel (polskie ustawienia regionalne) poprawnie otworzył plik
+    yield "\ufeff"
+    writer = csv.writer(Echo(), delimiter=";")
+    for row in rows:
+        yield writer.writerow(["" if value is None else value for value in row])
+
+
+def write_xlsx(rows):
+    # XlsxWriter w trybie constant_memory zapisuje wiersze od razu na dysk;
+    # gotowy plik tymczasowy jest następnie strumieniowany do klienta
+    import xlsxwriter
+
+    output = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True, "in_memory": False})
+    worksheet = workbook.add_worksheet("Wyniki")
+    bold = workbook.add_format({"bold": True})
+
+    for row_number, row in enumerate(rows):
+        worksheet.write_row(row_number, 0, row, bold if row_number == 0 else None)
+
+    workbook.close()
+    output.seek(0)
+    return output
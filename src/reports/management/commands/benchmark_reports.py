@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from reports.benchmarks import DEFAULT_SIZES, compare_results, run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Mierzy czas i liczbę zapytań widoków raportów i paneli dla organizacji 100 / 1k / 10k pracowników"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Liczby pracowników")
+        parser.add_argument("--repeat", type=int, default=5, help="Liczba powtórzeń pomiaru z cache")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default="benchmark_reports.json", help="Plik JSON z wynikami")
+        parser.add_argument("--compare", help="Plik JSON z wcześniejszymi wynikami do porównania")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Nie można wczytać pliku porównawczego: {e}")
+
+        setup_test_environment()
+        try:
+            results = run_benchmark(
+                sizes=options["sizes"],
+                repeat=options["repeat"],
+                seed=options["seed"],
+                log=self.stdout.write,
+            )
+        finally:
+            teardown_test_environment()
+
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Wyniki zapisane w {options['output']}"))
+
+        if baseline:
+            self.stdout.write("")
+            self.stdout.write(f"{'rozmiar':>8}  {'widok':<34} {'zapytania':>12} {'ms (mediana)':>20} {'zmiana':>8}")
+            for size, name, base_queries, queries, base_ms, ms, change in compare_results(baseline, results):
+                change = f"{change:+.1f}%" if change is not None else "-"
+                self.stdout.write(f"{size:>8}  {name:<34} {base_queries:>5} → {queries:<5} {base_ms:>9} → {ms:<9} {change:>8}")
@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.benchmarks import run_startup_benchmark
+
+
+class Command(BaseCommand):
+    help = "Mierzy start workera WSGI (czas importu i pamięć RSS) z leniwym i natychmiastowym importem wykresów matplotlib"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Liczba uruchomień każdego wariantu")
+        parser.add_argument("--output", help="Plik JSON z wynikami")
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat musi być większe od zera.")
+
+        results = run_startup_benchmark(repeat=options["repeat"], log=self.stdout.write)
+
+        lazy, eager = results["results"]["lazy"], results["results"]["eager"]
+        self.stdout.write("")
+        self.stdout.write(f"{'':<16} {'lazy':>10} {'eager':>10} {'różnica':>10}")
+        self.stdout.write(f"{'import [ms]':<16} {lazy['import_ms']:>10} {eager['import_ms']:>10} {eager['import_ms'] - lazy['import_ms']:>10.1f}")
+        if lazy["rss_mb"] is not None and eager["rss_mb"] is not None:
+            self.stdout.write(f"{'RSS [MB]':<16} {lazy['rss_mb']:>10} {eager['rss_mb']:>10} {eager['rss_mb'] - lazy['rss_mb']:>10.1f}")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Wyniki zapisane w {options['output']}"))
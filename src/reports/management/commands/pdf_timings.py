@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reports.models import PDFTiming
+from reports.pdf_timing import timing_summary
+
+
+class Command(BaseCommand):
+    help = "Percentyle p50/p95 czasów etapów generowania PDF (PDFTiming) dla rodzaju PDF i źródła pomiaru"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Pomiary z ostatnich N dni")
+        parser.add_argument("--kind", choices=[kind for kind, _ in PDFTiming._meta.get_field("kind").choices])
+        parser.add_argument("--source", choices=[source for source, _ in PDFTiming.SOURCE_CHOICES])
+        parser.add_argument("--prune", type=int, metavar="DAYS", help="Usuń pomiary starsze niż DAYS dni")
+
+    def handle(self, *args, **options):
+        if options["prune"] is not None:
+            deleted, _ = PDFTiming.objects.filter(
+                created_at__lt=timezone.now() - timedelta(days=options["prune"])
+            ).delete()
+            self.stdout.write(f"Usunięto pomiarów: {deleted}")
+
+        timings = PDFTiming.objects.filter(created_at__gte=timezone.now() - timedelta(days=options["days"]))
+        if options["kind"]:
+            timings = timings.filter(kind=options["kind"])
+        if options["source"]:
+            timings = timings.filter(source=options["source"])
+
+        summary = timing_summary(timings.values_list("kind", "source", "phases", "total_ms").iterator())
+        if not summary:
+            self.stdout.write("Brak pomiarów w wybranym okresie.")
+            return
+
+        self.stdout.write(f"{'rodzaj':<18} {'źródło':<8} {'etap':<12} {'liczba':>7} {'p50 [ms]':>10} {'p95 [ms]':>10}")
+        for (kind, source, phase), stats in sorted(summary.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] == "total")):
+            self.stdout.write(
+                f"{kind:<18} {source:<8} {phase:<12} {stats['count']:>7} {stats['p50']:>10.1f} {stats['p95']:>10.1f}"
+            )
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.pdf_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Generuje zlecone pliki PDF (PDFJob) i paczki PDF (PDFPack) w puli procesów i zapisuje je w PDF_CACHE_DIR"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=getattr(settings, "PDF_WORKER_PROCESSES", 2),
+            help="Liczba równoległych procesów renderujących (domyślnie PDF_WORKER_PROCESSES)",
+        )
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Co ile sekund sprawdzać nowe zlecenia")
+        parser.add_argument("--once", action="store_true", help="Przetwórz oczekujące zlecenia i zakończ")
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1:
+            raise CommandError("--processes musi być większe od zera.")
+
+        processed = run_worker(
+            processes=options["processes"],
+            poll_interval=options["poll_interval"],
+            once=options["once"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Przetworzono zleceń i paczek PDF: {processed}."))
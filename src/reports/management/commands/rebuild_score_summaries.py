@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from reports.summaries import rebuild_all_summaries, rebuild_stale_summaries
+from surveys.models import Survey
+
+
+class Command(BaseCommand):
+    help = "Przebudowuje tabele podsumowań punktów (ResponseScoreSummary, CompetencyScoreSummary)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--survey", type=int, action="append", help="ID ankiety (można podać wiele razy)")
+        parser.add_argument("--year", type=int, help="Tylko ankiety z danego roku")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--stale", action="store_true", help="Tylko podsumowania oznaczone przez autozapis ocen (np. z crona)")
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.all()
+        if options["survey"]:
+            surveys = surveys.filter(id__in=options["survey"])
+        if options["year"]:
+            surveys = surveys.filter(year=options["year"])
+
+        if options["stale"]:
+            rebuilt = rebuild_stale_summaries(response__survey__in=surveys)
+        else:
+            rebuilt = rebuild_all_summaries(surveys, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Przebudowano podsumowania dla {rebuilt} odpowiedzi."))
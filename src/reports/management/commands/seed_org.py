@@ -0,0 +1,46 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.seeding import SEED_PASSWORD, clear_seeded_org, seed_org, seeded_org_exists
+
+
+class Command(BaseCommand):
+    help = "Generuje syntetyczną organizację (działy, użytkownicy, ankiety, odpowiedzi i oceny) do testów wydajności"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=100, help="Liczba pracowników (bez managerów i team leaderów)")
+        parser.add_argument("--departments", type=int, help="Liczba działów (domyślnie 1 na 50 pracowników)")
+        parser.add_argument("--years", type=int, default=3, help="Liczba lat ankiet wstecz od --last-year")
+        parser.add_argument("--last-year", type=int, help="Ostatni rok ankiet (domyślnie bieżący)")
+        parser.add_argument("--questions-per-survey", type=int, default=15)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", default="seed", help="Prefiks nazw działów i loginów wygenerowanych danych")
+        parser.add_argument("--flush", action="store_true", help="Usuń wcześniej wygenerowane dane z tym prefiksem")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if seeded_org_exists(prefix):
+            if not options["flush"]:
+                raise CommandError(f"Dane z prefiksem '{prefix}' już istnieją - użyj --flush lub innego --prefix.")
+            clear_seeded_org(prefix)
+
+        start = perf_counter()
+        counts = seed_org(
+            employees=options["employees"],
+            departments=options["departments"],
+            years=options["years"],
+            last_year=options["last_year"],
+            questions_per_survey=options["questions_per_survey"],
+            seed=options["seed"],
+            prefix=prefix,
+        )
+        elapsed = perf_counter() - start
+
+        self.stdout.write(
+            "Działy: {departments}, użytkownicy: {users}, ankiety: {surveys}, odpowiedzi: {responses}, "
+            "odpowiedzi na pytania: {answers}, oceny managerów: {evaluations}, komentarze HR: {hr_evaluations}".format(**counts)
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Wygenerowano organizację w {elapsed:.1f} s. Logowanie: {counts['admin']} / {counts['hr']}, hasło: {SEED_PASSWORD}"
+        ))
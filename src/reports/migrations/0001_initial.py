@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('surveys', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseScoreSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('self_total', models.IntegerField(default=0)),
+                ('self_scored', models.PositiveIntegerField(default=0, help_text='Liczba pytań z oceną punktową pracownika')),
+                ('self_percentage', models.FloatField(default=0)),
+                ('manager_total', models.IntegerField(default=0)),
+                ('manager_scored', models.PositiveIntegerField(default=0, help_text='Liczba pytań z oceną punktową managera')),
+                ('manager_evaluations', models.PositiveIntegerField(default=0, help_text='Liczba wszystkich ocen managera')),
+                ('manager_percentage', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('response', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_summary', to='surveys.surveyresponse')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CompetencyScoreSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_count', models.PositiveIntegerField(default=0, help_text='Liczba pytań kompetencji w ankiecie')),
+                ('self_total', models.IntegerField(default=0)),
+                ('self_percentage', models.FloatField(default=0)),
+                ('manager_total', models.IntegerField(default=0)),
+                ('manager_percentage', models.FloatField(default=0)),
+                ('competency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='surveys.competency')),
+                ('response', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='competency_summaries', to='surveys.surveyresponse')),
+            ],
+            options={
+                'unique_together': {('response', 'competency')},
+            },
+        ),
+    ]
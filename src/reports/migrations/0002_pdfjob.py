@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        ('surveys', '0003_surveyresponse_status_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PDFJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('manager_overview', 'Podgląd oceny managera'), ('survey_result', 'Wyniki ankiety')], max_length=20)),
+                ('data_version', models.CharField(help_text='Wersja danych odpowiedzi, z których powstaje PDF', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Oczekuje'), ('running', 'W trakcie generowania'), ('done', 'Gotowy'), ('failed', 'Błąd')], default='pending', max_length=10)),
+                ('file_path', models.CharField(blank=True, max_length=500)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pdf_jobs', to=settings.AUTH_USER_MODEL)),
+                ('response', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pdf_jobs', to='surveys.surveyresponse')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='reports_pdf_status_3808cf_idx')],
+                'unique_together': {('kind', 'response', 'data_version')},
+            },
+        ),
+    ]
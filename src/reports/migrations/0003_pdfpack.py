@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_pdfjob'),
+        ('surveys', '0003_surveyresponse_status_rollups'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PDFPack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('manager_overview', 'Podgląd oceny managera'), ('survey_result', 'Wyniki ankiety')], default='manager_overview', max_length=20)),
+                ('year', models.PositiveIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Oczekuje'), ('running', 'W trakcie generowania'), ('done', 'Gotowy')], default='pending', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('rendered', models.PositiveIntegerField(default=0, help_text='PDF wygenerowane na potrzeby paczki')),
+                ('reused', models.PositiveIntegerField(default=0, help_text='PDF aktualne już wcześniej (z dysku)')),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(blank=True, help_text='Ostatni postęp - paczka bez postępu jest wznawiana', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pdf_packs', to='users.department')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pdf_packs', to=settings.AUTH_USER_MODEL)),
+                ('survey', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pdf_packs', to='surveys.survey')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='reports_pdf_status_ce2d47_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_pdfpack'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PDFTiming',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('manager_overview', 'Podgląd oceny managera'), ('survey_result', 'Wyniki ankiety')], max_length=20)),
+                ('source', models.CharField(choices=[('view', 'Widok PDF (sprawdzenie wersji / podanie pliku)'), ('worker', 'Generowanie PDF (pdf_worker)'), ('sync', 'Generowanie PDF w żądaniu')], max_length=10)),
+                ('response_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('phases', models.JSONField(default=dict, help_text='Etap -> czas w ms')),
+                ('total_ms', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'source', 'created_at'], name='reports_pdf_kind_986fa3_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_pdftiming'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='responsescoresummary',
+            name='stale_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
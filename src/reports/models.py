@@ -1,3 +1,158 @@
+from django.conf import settings
 from django.db import models
+from surveys.models import Survey, SurveyResponse, Competency
+from users.models import Department
 
-# Create your models here.
+
+# Podsumowanie punktów dla jednej odpowiedzi - samoocena i ocena managera
+# Utrzymywane przyrostowo przez widoki zapisu ocen (reports.summaries)
+class ResponseScoreSummary(models.Model):
+    response = models.OneToOneField(
+        SurveyResponse,
+        on_delete=models.CASCADE,
+        related_name="score_summary"
+    )
+    self_total = models.IntegerField(default=0)
+    self_scored = models.PositiveIntegerField(default=0, help_text="Liczba pytań z oceną punktową pracownika")
+    self_percentage = models.FloatField(default=0)
+    manager_total = models.IntegerField(default=0)
+    manager_scored = models.PositiveIntegerField(default=0, help_text="Liczba pytań z oceną punktową managera")
+    manager_evaluations = models.PositiveIntegerField(default=0, help_text="Liczba wszystkich ocen managera")
+    manager_percentage = models.FloatField(default=0)
+    # Ostatni autozapis oceny jeszcze niewliczony do podsumowania (reports.summaries.rebuild_stale_summaries)
+    stale_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Podsumowanie {self.response}"
+
+
+# Podsumowanie punktów kompetencji dla jednej odpowiedzi
+class CompetencyScoreSummary(models.Model):
+    response = models.ForeignKey(
+        SurveyResponse,
+        on_delete=models.CASCADE,
+        related_name="competency_summaries"
+    )
+    competency = models.ForeignKey(Competency, on_delete=models.CASCADE)
+    question_count = models.PositiveIntegerField(default=0, help_text="Liczba pytań kompetencji w ankiecie")
+    self_total = models.IntegerField(default=0)
+    self_percentage = models.FloatField(default=0)
+    manager_total = models.IntegerField(default=0)
+    manager_percentage = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ("response", "competency")
+
+    def __str__(self):
+        return f"{self.competency} – {self.response}"
+
+
+# Zlecenie wygenerowania PDF w tle - kolejka w bazie obsługiwana przez manage.py pdf_worker (reports.pdf_jobs)
+class PDFJob(models.Model):
+    KIND_CHOICES = [
+        ("manager_overview", "Podgląd oceny managera"),
+        ("survey_result", "Wyniki ankiety"),
+    ]
+    STATUS_CHOICES = [
+        ("pending", "Oczekuje"),
+        ("running", "W trakcie generowania"),
+        ("done", "Gotowy"),
+        ("failed", "Błąd"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    response = models.ForeignKey(
+        SurveyResponse,
+        on_delete=models.CASCADE,
+        related_name="pdf_jobs"
+    )
+    data_version = models.CharField(max_length=64, help_text="Wersja danych odpowiedzi, z których powstaje PDF")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="pdf_jobs"
+    )
+    file_path = models.CharField(max_length=500, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("kind", "response", "data_version")
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"PDF {self.get_kind_display()} – {self.response} ({self.get_status_display()})"
+
+
+# Paczka PDF (ZIP) wszystkich wysłanych odpowiedzi ankiety lub działu w danym roku - renderowana przez pdf_worker,
+# gotowe PDF pojedynczych odpowiedzi z dysku są wykorzystywane ponownie
+class PDFPack(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Oczekuje"),
+        ("running", "W trakcie generowania"),
+        ("done", "Gotowy"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=PDFJob.KIND_CHOICES, default="manager_overview")
+    survey = models.ForeignKey(Survey, null=True, blank=True, on_delete=models.CASCADE, related_name="pdf_packs")
+    department = models.ForeignKey(Department, null=True, blank=True, on_delete=models.CASCADE, related_name="pdf_packs")
+    year = models.PositiveIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    total = models.PositiveIntegerField(default=0)
+    rendered = models.PositiveIntegerField(default=0, help_text="PDF wygenerowane na potrzeby paczki")
+    reused = models.PositiveIntegerField(default=0, help_text="PDF aktualne już wcześniej (z dysku)")
+    failed = models.PositiveIntegerField(default=0)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="pdf_packs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(null=True, blank=True, help_text="Ostatni postęp - paczka bez postępu jest wznawiana")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    @property
+    def processed(self):
+        return self.rendered + self.reused + self.failed
+
+    @property
+    def progress(self):
+        return round(self.processed / self.total * 100) if self.total else 0
+
+    def __str__(self):
+        scope = self.survey if self.survey_id else f"{self.department} {self.year}"
+        return f"Paczka PDF – {scope} ({self.get_status_display()})"
+
+
+# Czasy etapów generowania PDF (reports.pdf_timing) - jeden wiersz na pomiar, percentyle: manage.py pdf_timings
+class PDFTiming(models.Model):
+    SOURCE_CHOICES = [
+        ("view", "Widok PDF (sprawdzenie wersji / podanie pliku)"),
+        ("worker", "Generowanie PDF (pdf_worker)"),
+        ("sync", "Generowanie PDF w żądaniu"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=PDFJob.KIND_CHOICES)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    response_id = models.PositiveIntegerField(null=True, blank=True)
+    phases = models.JSONField(default=dict, help_text="Etap -> czas w ms")
+    total_ms = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["kind", "source", "created_at"])]
+
+    def __str__(self):
+        return f"{self.kind} ({self.source}) – {self.total_ms:.1f} ms"
@@ -0,0 +1,182 @@
+# DANE I RENDEROWANIE PDF (podgląd oceny managera, wyniki ankiety pracownika)
+# Kontekst szablonów budowany bez obiektu żądania - ten sam dla widoków PDF i workera kolejki (reports.pdf_jobs)
+
+import base64
+import hashlib
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import find
+from django.template.loader import get_template, render_to_string
+from django.utils.text import slugify
+
+from evaluations.models import EmployeeEvaluation
+from surveys.models import SurveyAnswer
+from surveys.rows import answer_rows
+from surveys.scoring import competency_scores
+
+from .chart_cache import cached_chart
+from .pdf_backends import render_template_to_pdf
+from .pdf_timing import timed
+from .svg_charts import radar_svg, svg_data_uri
+
+
+MANAGER_OVERVIEW = "manager_overview"
+SURVEY_RESULT = "survey_result"
+
+PDF_TEMPLATES = {
+    MANAGER_OVERVIEW: "evaluations/manager_survey_overview_pdf.html",
+    SURVEY_RESULT: "surveys/survey_pdf.html",
+}
+
+PDF_CMD_OPTIONS = {
+    'footer-right': 'Strona [page] z [topage]',
+    'footer-font-size': '8',
+    'footer-spacing': '5',
+    'margin-bottom': '15mm',
+}
+
+# Wstawiany zamiast obrazka wykresu przy liczeniu wersji danych - wykres wynika z tabeli kompetencji w tym samym HTML
+CHART_PLACEHOLDER = "chart"
+
+
+@timed("logo")
+def logo_base64():
+    # Użycie finders do zlokalizowania pliku w STATICFILES_DIRS
+    logo_path = find("ats.jpg")
+    if logo_path and os.path.exists(logo_path):
+        try:
+            with open(logo_path, "rb") as f:
+                return base64.b64encode(f.read()).decode("utf-8")
+        except Exception as e:
+            print(f"Błąd podczas kodowania logo do base64: {e}")
+    else:
+        print("NIE ZNALEZIONO LOGO: ats.jpg nie znaleziono w ścieżkach statycznych!")
+    return None
+
+
+def chart_renderer():
+    # "svg" - wykres budowany jako napis (reports.svg_charts), "matplotlib" - dotychczasowy obrazek PNG
+    return getattr(settings, "PDF_CHART_RENDERER", "svg")
+
+
+def _plotting():
+    # matplotlib + numpy ładowane dopiero przy pierwszym wykresie PNG - nie przy starcie każdego workera WSGI
+    from . import charts
+    return charts
+
+
+@timed("chart")
+def radar_chart(labels, values):
+    # Zwraca data URI obrazka do <img src="...">
+    if not labels or not values:
+        return None
+    if chart_renderer() == "svg":
+        return cached_chart(
+            "radar_svg", lambda: svg_data_uri(radar_svg(labels, [("Wynik", "blue", values)])), labels, values
+        )
+    return cached_chart("radar", lambda: _plotting().radar_chart_png(labels, values), labels, values)
+
+
+@timed("chart")
+def user_manager_radar_chart(labels, user_values, manager_values):
+    if not labels:
+        return None
+    if chart_renderer() == "svg":
+        series = [("Pracownik", "#0d6efd", user_values), ("Manager", "#000000", manager_values)]
+        return cached_chart(
+            "user_manager_radar_svg",
+            lambda: svg_data_uri(radar_svg(labels, series, "user_manager")),
+            labels, user_values, manager_values,
+        )
+    return cached_chart(
+        "user_manager_radar",
+        lambda: _plotting().user_manager_radar_chart_png(labels, user_values, manager_values),
+        labels, user_values, manager_values,
+    )
+
+
+def manager_overview_context(response, charts=True):
+    # Odpowiedzi pracownika i managera
+    answers_user = response.answers.all()
+    answers_manager = EmployeeEvaluation.objects.filter(employee_response=response)
+
+    # Wyliczenie kompetencji
+    labels, user_values, manager_values = competency_scores(response.survey, answers_user, answers_manager)
+    radar_image = None
+    if len(labels) >= 3:
+        radar_image = user_manager_radar_chart(labels, user_values, manager_values) if charts else CHART_PLACEHOLDER
+
+    # 🔹 SUMA PUNKTÓW – tylko oceny managera
+    manager_scored = [a.scale_value for a in answers_manager if a.scale_value is not None]
+    manager_total_points = sum(manager_scored)
+    manager_max_points = len(manager_scored) * 10 if manager_scored else 0
+    manager_percentage = round((manager_total_points / manager_max_points) * 100, 2) if manager_max_points else 0
+
+    return {
+        "response": response,
+        "answers_manager": answers_manager,
+        "rows": answer_rows(response.survey, answers_user, answers_manager),
+        "radar_image": radar_image,
+        "radar_data": list(zip(labels, user_values, manager_values)),
+        "show_radar": True,
+        "scale_range": range(0, 11),
+        "logo_base64": logo_base64(),
+        "manager_total_points": manager_total_points,
+        "manager_max_points": manager_max_points,
+        "manager_percentage": manager_percentage,
+    }
+
+
+def survey_result_context(survey, user, response=None, charts=True):
+    # response=None - użytkownik nie wypełnił ankiety, PDF bez odpowiedzi
+    answers = SurveyAnswer.objects.filter(response=response) if response else []
+    radar_labels, radar_values, _ = competency_scores(survey, answers)
+    radar_image = None
+    if radar_labels and radar_values:
+        radar_image = radar_chart(radar_labels, radar_values) if charts else CHART_PLACEHOLDER
+
+    return {
+        "survey": survey,
+        "rows": answer_rows(survey, answers),
+        "scale_range": range(0, 11),
+        "radar_image": radar_image,
+        "radar_data": list(zip(radar_labels, radar_values)),
+        "user": user,
+        "show_radar": len(radar_labels) > 2,
+        "logo_base64": logo_base64(),
+    }
+
+
+def pdf_context(kind, response, charts=True):
+    with timed("context"):
+        if kind == MANAGER_OVERVIEW:
+            return manager_overview_context(response, charts)
+        return survey_result_context(response.survey, response.user, response, charts)
+
+
+def pdf_filename(kind, response):
+    if kind == MANAGER_OVERVIEW:
+        return f"{slugify(response.survey.name)}_{slugify(response.user.get_full_name())}.pdf"
+    return f"{response.survey.name}_{response.survey.year}_{response.user.username}.pdf"
+
+
+def _data_version(kind, context):
+    # Skrót HTML dokumentu ze znacznikiem zamiast obrazka wykresu - wykres wynika z tabeli kompetencji w tym samym HTML,
+    # więc wersja zmienia się dokładnie wtedy, gdy zmienia się treść PDF
+    with timed("version"):
+        if context["radar_image"]:
+            context = dict(context, radar_image=CHART_PLACEHOLDER)
+        html = render_to_string(PDF_TEMPLATES[kind], context)
+        return hashlib.sha256(html.encode("utf-8")).hexdigest()[:32]
+
+
+def pdf_data_version(kind, response):
+    return _data_version(kind, pdf_context(kind, response, charts=False))
+
+
+def render_pdf(kind, response):
+    # Zwraca (wersja danych, zawartość PDF) - wersja liczona z tych samych danych, z których powstał dokument
+    context = pdf_context(kind, response)
+    content = render_template_to_pdf(get_template(PDF_TEMPLATES[kind]), context, cmd_options=PDF_CMD_OPTIONS)
+    return _data_version(kind, context), content
@@ -0,0 +1,228 @@
+# BACKENDY HTML -> PDF
+# "subprocess" - nowy proces wkhtmltopdf dla każdego dokumentu (django-wkhtmltopdf, dotychczasowe zachowanie)
+# "pool" - kilka długo działających procesów "wkhtmltopdf --read-args-from-stdin" zasilanych przez potoki:
+# jedna linia argumentów = jeden dokument, bez kosztu startu procesu (Qt/WebKit) przy każdym PDF.
+# Liczba procesów jest ograniczona (PDF_POOL_SIZE) - przy nadmiarze żądań czekamy na wolny renderer
+# najwyżej PDF_POOL_QUEUE_TIMEOUT sekund, potem PDFRenderBusy zamiast uruchamiania kolejnych procesów.
+
+import atexit
+import logging
+import os
+import queue
+import shlex
+import subprocess
+import tempfile
+import threading
+from copy import copy
+
+from django.conf import settings
+from wkhtmltopdf.utils import RenderedFile, _options_to_args, convert_to_pdf
+from wkhtmltopdf.views import PDFTemplateResponse
+
+from .pdf_timing import timed
+
+
+logger = logging.getLogger(__name__)
+
+
+class PDFRenderError(Exception):
+    pass
+
+
+class PDFRenderBusy(PDFRenderError):
+    # Wszystkie renderery zajęte dłużej niż PDF_POOL_QUEUE_TIMEOUT
+    pass
+
+
+def wkhtmltopdf_cmd():
+    return shlex.split(getattr(settings, "WKHTMLTOPDF_CMD", os.environ.get("WKHTMLTOPDF_CMD", "wkhtmltopdf")))
+
+
+def wkhtmltopdf_env():
+    env = getattr(settings, "WKHTMLTOPDF_ENV", None)
+    return dict(os.environ, **env) if env is not None else None
+
+
+def wkhtmltopdf_options(cmd_options):
+    # Te same opcje co django-wkhtmltopdf: WKHTMLTOPDF_CMD_OPTIONS + opcje dokumentu, kodowanie utf8
+    options = copy(getattr(settings, "WKHTMLTOPDF_CMD_OPTIONS", None) or {"quiet": True})
+    options.update(cmd_options or {})
+    options.setdefault("encoding", "utf8")
+    return options
+
+
+class SubprocessBackend:
+    def render(self, filename, cmd_options=None):
+        return convert_to_pdf(filename, cmd_options=dict(cmd_options or {}))
+
+
+def _quote(arg):
+    # Linia argumentów wkhtmltopdf: cudzysłowy i ukośniki poprzedzone "\"
+    return '"{}"'.format(arg.replace("\\", "\\\\").replace('"', '\\"'))
+
+
+class _Renderer:
+    # Jeden proces wkhtmltopdf czytający kolejne zlecenia ze stdin; koniec dokumentu = linia "Done" na stderr
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [*wkhtmltopdf_cmd(), "--read-args-from-stdin"],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            env=wkhtmltopdf_env(), text=True, encoding="utf-8", errors="replace", bufsize=1,
+        )
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            self.lines.put(line.strip())
+        self.lines.put(None)
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def render(self, filename, cmd_options, timeout):
+        options = wkhtmltopdf_options(cmd_options)
+        # bez "quiet" - potrzebujemy komunikatu o zakończeniu dokumentu
+        options["quiet"] = None
+        fd, output = tempfile.mkstemp(prefix="wkhtmltopdf", suffix=".pdf")
+        os.close(fd)
+        try:
+            args = [*_options_to_args(**options), filename, output]
+            self.process.stdin.write(" ".join(_quote(arg) for arg in args) + "\n")
+            self.process.stdin.flush()
+            while True:
+                try:
+                    line = self.lines.get(timeout=timeout)
+                except queue.Empty:
+                    raise PDFRenderError(f"wkhtmltopdf nie zakończył dokumentu w ciągu {timeout} s")
+                if line is None:
+                    raise PDFRenderError("proces wkhtmltopdf zakończył działanie")
+                if line.startswith("Done"):
+                    break
+                if line.startswith(("Error", "Exit with code")):
+                    # proces jest potem zamykany (PoolBackend._discard) - resztki komunikatów nie trafią do kolejnego dokumentu
+                    raise PDFRenderError(line)
+            with open(output, "rb") as f:
+                content = f.read()
+            if not content:
+                raise PDFRenderError("wkhtmltopdf nie zapisał pliku PDF")
+            return content
+        except OSError as e:
+            raise PDFRenderError(str(e))
+        finally:
+            os.unlink(output)
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+
+    def close(self):
+        # Koniec stdin = wkhtmltopdf kończy pracę po bieżącym dokumencie
+        if self.alive():
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+
+class PoolBackend:
+    def __init__(self, size=2, queue_timeout=30, render_timeout=120):
+        self.queue_timeout = queue_timeout
+        self.render_timeout = render_timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._renderers = []
+        self._lock = threading.Lock()
+
+    def _take(self):
+        # Ostatnio używany wolny renderer albo nowy proces (najwyżej size jednocześnie - pilnuje _slots)
+        while True:
+            try:
+                renderer = self._idle.get_nowait()
+            except queue.Empty:
+                renderer = _Renderer()
+                with self._lock:
+                    self._renderers.append(renderer)
+                return renderer
+            if renderer.alive():
+                return renderer
+            self._discard(renderer)
+
+    def _discard(self, renderer):
+        renderer.kill()
+        with self._lock:
+            if renderer in self._renderers:
+                self._renderers.remove(renderer)
+
+    def render(self, filename, cmd_options=None):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PDFRenderBusy("Wszystkie procesy generujące PDF są zajęte.")
+        try:
+            renderer = None
+            try:
+                renderer = self._take()
+                content = renderer.render(filename, cmd_options, self.render_timeout)
+            except (OSError, PDFRenderError) as e:
+                # proces w nieznanym stanie - następne zlecenie dostanie nowy, a ten dokument powstaje
+                # dotychczasowym sposobem (osobny proces wkhtmltopdf) w ramach tego samego limitu procesów
+                if renderer is not None:
+                    self._discard(renderer)
+                logger.warning("Pula wkhtmltopdf: %s - generowanie w osobnym procesie", e)
+                return SubprocessBackend().render(filename, cmd_options)
+            self._idle.put(renderer)
+            return content
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            renderers, self._renderers = self._renderers, []
+        for renderer in renderers:
+            renderer.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    # Jeden backend na proces (worker WSGI albo proces puli pdf_worker)
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if getattr(settings, "PDF_BACKEND", "pool") == "pool":
+                _backend = PoolBackend(
+                    size=getattr(settings, "PDF_POOL_SIZE", 2),
+                    queue_timeout=getattr(settings, "PDF_POOL_QUEUE_TIMEOUT", 30),
+                    render_timeout=getattr(settings, "PDF_RENDER_TIMEOUT", 120),
+                )
+                atexit.register(_backend.close)
+            else:
+                _backend = SubprocessBackend()
+        return _backend
+
+
+def render_file_to_pdf(filename, cmd_options=None):
+    # PDFRenderBusy - pula pełna (tylko backend "pool"), błędy wkhtmltopdf jak w django-wkhtmltopdf
+    return get_backend().render(filename, cmd_options)
+
+
+def render_template_to_pdf(template, context, request=None, cmd_options=None):
+    # Odpowiednik wkhtmltopdf.utils.render_pdf_from_template (plik HTML z absolutnymi ścieżkami static) przez backend
+    with timed("template"):
+        input_file = RenderedFile(template=template, context=context, request=request)
+    with timed("wkhtmltopdf"):
+        return render_file_to_pdf(input_file.filename, cmd_options)
+
+
+class BackendPDFTemplateResponse(PDFTemplateResponse):
+    # PDFTemplateResponse generowany przez backend (bez nagłówka/stopki HTML - nieużywane w aplikacji)
+    @property
+    def rendered_content(self):
+        return render_template_to_pdf(
+            self.resolve_template(self.template_name),
+            self.resolve_context(self.context_data),
+            request=self._request,
+            cmd_options=self.cmd_options.copy(),
+        )
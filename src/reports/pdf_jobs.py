@@ -0,0 +1,289 @@
+# KOLEJKA GENEROWANIA PDF W TLE + PLIKI PDF NA DYSKU
+# Widok PDF oddaje gotowy plik z dysku (klucz: rodzaj, odpowiedź, wersja danych) albo zleca PDFJob i od razu
+# odpowiada stroną ze statusem odpytywanym przez HTMX. Zlecenia i paczki PDF (PDFPack -> ZIP) renderuje
+# manage.py pdf_worker w puli procesów.
+
+import multiprocessing
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+from pathlib import Path
+from time import sleep
+
+import django
+from django.conf import settings
+from django.db.models import F
+from django.http import FileResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from surveys.models import SurveyResponse
+
+from .models import PDFJob, PDFPack
+from .pdf import MANAGER_OVERVIEW, pdf_data_version, pdf_filename, render_pdf
+from .pdf_timing import measure, timed
+
+
+# Zlecenie "w trakcie" dłużej niż tyle uznajemy za porzucone przez zatrzymany worker
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def pdf_cache_dir():
+    return Path(getattr(settings, "PDF_CACHE_DIR", settings.BASE_DIR / "pdf_cache"))
+
+
+def cached_pdf_path(kind, response_id, version):
+    return pdf_cache_dir() / kind / str(response_id) / f"{version}.pdf"
+
+
+def store_pdf(kind, response_id, version, content):
+    # Zapis przez plik tymczasowy + os.replace - widok nigdy nie odczyta niepełnego pliku
+    path = cached_pdf_path(kind, response_id, version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+    # starsze wersje PDF tej odpowiedzi nie będą już serwowane
+    for old_path in path.parent.glob("*.pdf"):
+        if old_path != path:
+            old_path.unlink(missing_ok=True)
+    return path
+
+
+def cached_pdf(kind, response_id):
+    # Aktualnie przechowywany PDF odpowiedzi (store_pdf zostawia jedną wersję) lub None
+    return next(iter(sorted((pdf_cache_dir() / kind / str(response_id)).glob("*.pdf"))), None)
+
+
+def pdf_url(kind, response):
+    if kind == MANAGER_OVERVIEW:
+        return reverse("manager_survey_overview_pdf", args=[response.id])
+    return reverse("survey_pdf", kwargs={"slug": response.survey.slug, "user_id": response.user_id})
+
+
+def enqueue_pdf(kind, response, version, user=None):
+    # Jedno zlecenie na (rodzaj, odpowiedź, wersja danych) - ponowne kliknięcia dołączają do istniejącego
+    job, created = PDFJob.objects.get_or_create(
+        kind=kind, response=response, data_version=version,
+        defaults={"requested_by": user},
+    )
+    if not created and job.status in ["done", "failed"]:
+        # plik zniknął z dysku albo poprzednia próba się nie udała - zlecamy ponownie
+        PDFJob.objects.filter(pk=job.pk).update(status="pending", error="", file_path="", started_at=None, finished_at=None)
+        job.refresh_from_db()
+    return job
+
+
+def pdf_response(request, kind, response):
+    # Gotowy PDF z dysku, jeśli dane odpowiedzi się nie zmieniły - w przeciwnym razie zlecenie i strona statusu
+    with measure(kind, "view", response.id) as timer:
+        version = pdf_data_version(kind, response)
+        path = cached_pdf_path(kind, response.id, version)
+        with timed("serve"):
+            if path.exists():
+                http_response = FileResponse(
+                    open(path, "rb"), as_attachment=True, filename=pdf_filename(kind, response), content_type="application/pdf"
+                )
+            else:
+                job = enqueue_pdf(kind, response, version, request.user)
+                http_response = render(request, "reports/pdf_job.html", {"job": job, "pdf_url": pdf_url(kind, response)})
+    http_response["Server-Timing"] = timer.server_timing()
+    return http_response
+
+
+def claim_jobs(limit):
+    # Warunkowy UPDATE - przy kilku workerach każde zlecenie przejmuje dokładnie jeden
+    claimed = []
+    if limit <= 0:
+        return claimed
+    pending = PDFJob.objects.filter(status="pending").order_by("created_at", "id").values_list("id", flat=True)[:limit]
+    for job_id in pending:
+        if PDFJob.objects.filter(pk=job_id, status="pending").update(status="running", started_at=timezone.now()):
+            claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale_jobs():
+    stale_before = timezone.now() - STALE_JOB_TIMEOUT
+    PDFPack.objects.filter(status="running", updated_at__lt=stale_before).update(status="pending")
+    return PDFJob.objects.filter(status="running", started_at__lt=stale_before).update(status="pending", started_at=None)
+
+
+def mark_failed(job_id, error):
+    PDFJob.objects.filter(pk=job_id).update(status="failed", error=str(error), finished_at=timezone.now())
+
+
+def run_job(job_id):
+    # Wykonywane w procesie puli - wykres, HTML i wkhtmltopdf dla jednego zlecenia
+    job = PDFJob.objects.select_related("response__survey", "response__user__department").get(pk=job_id)
+    try:
+        with measure(job.kind, "worker", job.response_id):
+            version, content = render_pdf(job.kind, job.response)
+            path = store_pdf(job.kind, job.response_id, version, content)
+    except Exception as e:
+        mark_failed(job_id, e)
+        return False
+
+    PDFJob.objects.filter(pk=job_id).update(status="done", file_path=str(path), error="", finished_at=timezone.now())
+    return True
+
+
+# PACZKI PDF - wszystkie wysłane odpowiedzi ankiety albo działu w danym roku
+
+def pack_responses(pack):
+    responses = SurveyResponse.objects.filter(status__in=["submitted", "closed"])
+    if pack.survey_id:
+        responses = responses.filter(survey_id=pack.survey_id)
+    else:
+        responses = responses.filter(survey__department_id=pack.department_id, survey__year=pack.year)
+    return responses.order_by("survey__name", "user__last_name", "user__first_name", "id")
+
+
+def claim_pack():
+    # (id paczki, rodzaj, id odpowiedzi) albo None - licznik postępu liczony od zera przy każdym (wznowionym) przebiegu
+    for pack_id in PDFPack.objects.filter(status="pending").order_by("created_at", "id").values_list("id", flat=True)[:5]:
+        now = timezone.now()
+        if PDFPack.objects.filter(pk=pack_id, status="pending").update(status="running", started_at=now, updated_at=now):
+            pack = PDFPack.objects.get(pk=pack_id)
+            response_ids = list(pack_responses(pack).values_list("id", flat=True))
+            PDFPack.objects.filter(pk=pack_id).update(total=len(response_ids), rendered=0, reused=0, failed=0)
+            return pack_id, pack.kind, response_ids
+    return None
+
+
+def run_pack_item(kind, response_id):
+    # Wykonywane w procesie puli - aktualny PDF z dysku jest wykorzystywany ponownie, pozostałe renderowane
+    response = SurveyResponse.objects.select_related("survey", "user__department").get(pk=response_id)
+    if cached_pdf_path(kind, response_id, pdf_data_version(kind, response)).exists():
+        return "reused"
+    with measure(kind, "worker", response_id):
+        version, content = render_pdf(kind, response)
+        store_pdf(kind, response_id, version, content)
+    return "rendered"
+
+
+def record_pack_item(pack_id, result):
+    field = result if result in ["rendered", "reused"] else "failed"
+    PDFPack.objects.filter(pk=pack_id).update(**{field: F(field) + 1}, updated_at=timezone.now())
+
+
+def finish_pack(pack_id):
+    now = timezone.now()
+    PDFPack.objects.filter(pk=pack_id).update(status="done", updated_at=now, finished_at=now)
+
+
+class _ZipBuffer:
+    # Strumień bez seek - zipfile zapisuje wtedy rozmiary plików w deskryptorach za ich danymi
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def pack_zip_stream(pack):
+    # ZIP generowany plik po pliku (StreamingHttpResponse) - w pamięci najwyżej jeden PDF
+    buffer = _ZipBuffer()
+    names = set()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for response in pack_responses(pack).select_related("survey", "user"):
+            path = cached_pdf(pack.kind, response.id)
+            if path is None:
+                continue
+
+            name = pdf_filename(pack.kind, response)
+            if not pack.survey_id:
+                name = f"{slugify(response.survey.name)}/{name}"
+            if name in names:
+                name = f"{name[:-len('.pdf')]}_{response.id}.pdf"
+            names.add(name)
+
+            try:
+                archive.write(path, name)
+            except FileNotFoundError:
+                # w międzyczasie zastąpiony nowszą wersją - pomijamy zamiast przerywać pobieranie
+                continue
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def pack_filename(pack):
+    scope = slugify(pack.survey.name) if pack.survey_id else f"{slugify(pack.department.name)}_{pack.year}"
+    return f"pdf_{scope}.zip"
+
+
+def run_worker(processes=2, poll_interval=2.0, once=False, log=None):
+    # once=True - przetwarza zaległe zlecenia i paczki, potem kończy pracę (np. z crona)
+    requeue_stale_jobs()
+    processed = 0
+    # "spawn" - każdy proces z własnym połączeniem do bazy (django.setup() w procesie potomnym), działa też na Windows
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=django.setup) as pool:
+        running = {}           # future -> ("job", id zlecenia) / ("pack", id paczki)
+        pack_items = deque()   # pozycje paczek czekające na wolny proces
+        pack_remaining = {}    # id paczki -> liczba nieukończonych pozycji
+        while True:
+            # pojedyncze PDF (ktoś czeka na stronie statusu) mają pierwszeństwo przed pozycjami paczek
+            for job_id in claim_jobs(processes - len(running)):
+                running[pool.submit(run_job, job_id)] = ("job", job_id)
+
+            if not pack_items and len(running) < processes:
+                claimed = claim_pack()
+                if claimed:
+                    pack_id, kind, response_ids = claimed
+                    pack_remaining[pack_id] = len(response_ids)
+                    pack_items.extend((pack_id, kind, response_id) for response_id in response_ids)
+                    if not response_ids:
+                        finish_pack(pack_id)
+                        del pack_remaining[pack_id]
+                    continue
+
+            while pack_items and len(running) < processes:
+                pack_id, kind, response_id = pack_items.popleft()
+                running[pool.submit(run_pack_item, kind, response_id)] = ("pack", pack_id)
+
+            if not running:
+                if once:
+                    return processed
+                sleep(poll_interval)
+                continue
+
+            done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, task_id = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # np. błąd wkhtmltopdf albo przerwany proces puli - pozycja nie może zostać "w trakcie"
+                    result = e
+
+                if task == "job":
+                    if isinstance(result, Exception):
+                        mark_failed(task_id, result)
+                    processed += 1
+                    if log:
+                        log(f"PDF #{task_id}: {'gotowy' if result is True else 'błąd'}")
+                    continue
+
+                record_pack_item(task_id, result)
+                pack_remaining[task_id] -= 1
+                if not pack_remaining[task_id]:
+                    del pack_remaining[task_id]
+                    finish_pack(task_id)
+                    processed += 1
+                    if log:
+                        log(f"Paczka PDF #{task_id}: gotowa")
@@ -0,0 +1,118 @@
+# POMIAR CZASU ETAPÓW GENEROWANIA PDF
+# Etapy (kontekst, wykres, logo, szablon, wkhtmltopdf...) mierzone blokami "with timed(...)" w reports.pdf
+# i reports.pdf_backends - bez przekazywania licznika przez argumenty (contextvars).
+# Wynik: linia logu klucz=wartość (logger reports.pdf_timing), nagłówek Server-Timing w widokach
+# i wiersz PDFTiming (percentyle: manage.py pdf_timings).
+# Czasy są wyłączne - np. "context" nie zawiera zagnieżdżonych "chart" i "logo".
+
+import contextvars
+import logging
+import math
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.conf import settings
+
+from .models import PDFTiming
+
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("pdf_phase_timer", default=None)
+
+
+class PhaseTimer:
+    def __init__(self, kind, source, response_id=None):
+        self.kind = kind
+        self.source = source
+        self.response_id = response_id
+        self.phases = {}
+        self._children = [0.0]
+        self._start = perf_counter()
+        self.total_ms = None
+
+    def add(self, name, elapsed, children):
+        self.phases[name] = self.phases.get(name, 0.0) + (elapsed - children) * 1000
+
+    def finish(self):
+        self.total_ms = (perf_counter() - self._start) * 1000
+        self.phases = {name: round(ms, 2) for name, ms in self.phases.items()}
+        # czas poza mierzonymi etapami (zapytania, zapis pliku, odpowiedź HTTP...)
+        self.phases["other"] = round(max(self.total_ms - sum(self.phases.values()), 0), 2)
+        self.total_ms = round(self.total_ms, 2)
+
+    def server_timing(self):
+        return ", ".join(
+            [f"pdf-{name};dur={ms:.1f}" for name, ms in self.phases.items()] + [f"pdf-total;dur={self.total_ms:.1f}"]
+        )
+
+    def log_line(self):
+        fields = {"kind": self.kind, "source": self.source, "response": self.response_id or "-"}
+        fields.update({f"{name}_ms": f"{ms:.2f}" for name, ms in self.phases.items()})
+        fields["total_ms"] = f"{self.total_ms:.2f}"
+        return "pdf_timing " + " ".join(f"{key}={value}" for key, value in fields.items())
+
+
+@contextmanager
+def timed(name):
+    # Etap bieżącego pomiaru; bez aktywnego pomiaru (np. wywołanie z shella) nic nie robi
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    timer._children.append(0.0)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - start
+        children = timer._children.pop()
+        timer._children[-1] += elapsed
+        timer.add(name, elapsed, children)
+
+
+@contextmanager
+def measure(kind, source, response_id=None):
+    # Pomiar całej operacji PDF; po zakończeniu log + zapis do PDFTiming (PDF_TIMING_STORE)
+    timer = PhaseTimer(kind, source, response_id)
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+        timer.finish()
+        logger.info(timer.log_line())
+        if getattr(settings, "PDF_TIMING_STORE", True):
+            store_timing(timer)
+
+
+def store_timing(timer):
+    try:
+        PDFTiming.objects.create(
+            kind=timer.kind, source=timer.source, response_id=timer.response_id,
+            phases=timer.phases, total_ms=timer.total_ms,
+        )
+    except Exception as e:
+        # pomiar nie może zepsuć pobierania PDF
+        logger.warning("Nie zapisano czasu PDF: %s", e)
+
+
+def percentile(values, fraction):
+    # Metoda najbliższej pozycji na posortowanej liście
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+def timing_summary(timings):
+    # (rodzaj, źródło, etap) -> {"count", "p50", "p95"}; timings - iterowalne (kind, source, phases, total_ms)
+    samples = {}
+    for kind, source, phases, total_ms in timings:
+        for name, ms in list(phases.items()) + [("total", total_ms)]:
+            samples.setdefault((kind, source, name), []).append(ms)
+
+    return {
+        key: {"count": len(values), "p50": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+        for key, values in samples.items()
+    }
@@ -0,0 +1,243 @@
+# WARSTWA ZAPYTAŃ RAPORTOWYCH
+# Zbiorcze zapytania do raportów - liczba zapytań nie zależy od liczby pracowników w dziale
+
+from django.db.models import Count, F, OuterRef, Subquery, Window
+from django.db.models.functions import Ntile, PercentRank, Rank, RowNumber
+
+from surveys.models import SurveyResponse
+from surveys.scoring import MAX_SCALE_VALUE
+
+from .models import CompetencyScoreSummary
+
+
+# Wynik procentowy managera (suma punktów / liczba ocenionych pytań × 10) z tabeli podsumowań
+MANAGER_PERCENTAGE = F("score_summary__manager_percentage")
+
+
+def percentage(total, max_points):
+    return round((total / max_points) * 100, 2) if max_points else 0
+
+
+def latest_submitted_responses(survey):
+    # Najnowsza wysłana odpowiedź każdego użytkownika dla danej ankiety
+    latest_response = (
+        SurveyResponse.objects
+        .filter(survey=survey, user=OuterRef("user"), status="submitted")
+        .order_by("-created_at")
+        .values("pk")[:1]
+    )
+    return SurveyResponse.objects.filter(
+        survey=survey,
+        status="submitted",
+        pk=Subquery(latest_response),
+    )
+
+
+def department_manager_scores(survey, department):
+    # Jedno zapytanie: przeliczone punkty managera dla każdego pracownika działu
+    rows = (
+        latest_submitted_responses(survey)
+        .filter(user__department=department, score_summary__manager_evaluations__gt=0)
+        .annotate(manager_percentage=MANAGER_PERCENTAGE)
+        .order_by("user_id")
+        .values(
+            "user_id", "user__first_name", "user__last_name",
+            "score_summary__manager_total", "score_summary__manager_scored", "manager_percentage",
+        )
+    )
+
+    return [
+        {
+            "user_id": row["user_id"],
+            "first_name": row["user__first_name"],
+            "last_name": row["user__last_name"],
+            "manager_total_points": row["score_summary__manager_total"],
+            "manager_max_points": row["score_summary__manager_scored"] * MAX_SCALE_VALUE,
+            "manager_percentage": row["manager_percentage"],
+        }
+        for row in rows
+    ]
+
+
+def latest_department_surveys(year=None):
+    # Najnowsza wysłana ankieta każdego działu (ROW_NUMBER w obrębie działu po dacie odpowiedzi)
+    responses = SurveyResponse.objects.filter(
+        status="submitted",
+        user__role="employee",
+        user__department__isnull=False,
+    )
+    if year:
+        responses = responses.filter(survey__year=year)
+
+    rows = (
+        responses
+        .annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=F("user__department_id"),
+            order_by=[F("created_at").desc(), F("id").desc()],
+        ))
+        .filter(row_number=1)
+        .order_by("user__department_id")
+        .values("user__department_id", "user__department__name", "survey_id", "survey__name")
+    )
+    return [
+        {
+            "department_id": row["user__department_id"],
+            "department_name": row["user__department__name"],
+            "survey_id": row["survey_id"],
+            "survey_name": row["survey__name"],
+        }
+        for row in rows
+    ]
+
+
+def latest_survey_manager_scores(year=None):
+    # Średnia ocena managera (skala 0-100) każdego pracownika w najnowszej ankiecie jego działu
+    departments = latest_department_surveys(year)
+    department_surveys = {dept["department_id"]: dept["survey_id"] for dept in departments}
+    if not department_surveys:
+        return departments, []
+
+    rows = (
+        SurveyResponse.objects
+        .filter(
+            status="submitted",
+            user__role="employee",
+            user__department_id__in=list(department_surveys),
+            survey_id__in=set(department_surveys.values()),
+        )
+        .annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F("user_id"), F("survey_id")],
+            order_by=[F("created_at").desc(), F("id").desc()],
+        ))
+        .filter(row_number=1)
+        .values(
+            "survey_id", "user__department_id", "user__department__name",
+            "user__first_name", "user__last_name",
+            "score_summary__manager_total", "score_summary__manager_scored",
+        )
+    )
+
+    scores = []
+    for row in rows:
+        # ankieta musi być najnowszą ankietą działu pracownika, z co najmniej jedną oceną punktową managera
+        if department_surveys[row["user__department_id"]] != row["survey_id"]:
+            continue
+        if not row["score_summary__manager_scored"]:
+            continue
+        scores.append({
+            "label": f"{row['user__first_name']} {row['user__last_name']} ({row['user__department__name']})",
+            "manager_score": round((row["score_summary__manager_total"] / row["score_summary__manager_scored"]) * MAX_SCALE_VALUE, 2),
+        })
+    return departments, scores
+
+
+def _delta(current, previous):
+    if current is None or previous is None:
+        return None
+    return round(current - previous, 2)
+
+
+def employee_trend(employee):
+    # Wyniki pracownika (ogólne + kompetencje, samoocena i ocena managera) we wszystkich ankietach
+    responses = list(
+        SurveyResponse.objects
+        .filter(user=employee, status="submitted", score_summary__isnull=False)
+        .select_related("survey", "score_summary")
+        .order_by("survey__year", "created_at", "id")
+    )
+
+    competency_rows = {}
+    for response_id, name, self_percentage, manager_percentage in (
+        CompetencyScoreSummary.objects
+        .filter(response__in=[response.id for response in responses])
+        .order_by("competency__name")
+        .values_list("response_id", "competency__name", "self_percentage", "manager_percentage")
+    ):
+        competency_rows.setdefault(response_id, {})[name] = {"self": self_percentage, "manager": manager_percentage}
+
+    surveys = []
+    for response in responses:
+        summary = response.score_summary
+        has_manager_evaluation = summary.manager_evaluations > 0
+        competencies = competency_rows.get(response.id, {})
+        if not has_manager_evaluation:
+            competencies = {name: {"self": row["self"], "manager": None} for name, row in competencies.items()}
+        surveys.append({
+            "response_id": response.id,
+            "survey_id": response.survey_id,
+            "survey": response.survey.name,
+            "year": response.survey.year,
+            "self_percentage": summary.self_percentage,
+            "manager_percentage": summary.manager_percentage if has_manager_evaluation else None,
+            "competencies": competencies,
+        })
+
+    # Rok do roku - dla każdego roku liczy się najnowsza ankieta
+    latest_by_year = {}
+    for survey in surveys:
+        latest_by_year[survey["year"]] = survey
+
+    years, previous = [], None
+    for year in sorted(latest_by_year):
+        current = latest_by_year[year]
+        competencies = {}
+        for name, row in current["competencies"].items():
+            prev_row = previous["competencies"].get(name, {}) if previous else {}
+            competencies[name] = {
+                "self": row["self"],
+                "manager": row["manager"],
+                "self_delta": _delta(row["self"], prev_row.get("self")),
+                "manager_delta": _delta(row["manager"], prev_row.get("manager")),
+            }
+        years.append({
+            "year": year,
+            "survey": current["survey"],
+            "self_percentage": current["self_percentage"],
+            "manager_percentage": current["manager_percentage"],
+            "self_delta": _delta(current["self_percentage"], previous["self_percentage"]) if previous else None,
+            "manager_delta": _delta(current["manager_percentage"], previous["manager_percentage"]) if previous else None,
+            "competencies": competencies,
+        })
+        previous = current
+
+    return {
+        "employee": {"id": employee.id, "name": employee.get_full_name()},
+        "surveys": surveys,
+        "years": years,
+    }
+
+
+def employee_ranking(year):
+    # Ranking wszystkich pracowników w roku wg oceny managera - funkcje okna liczone w bazie.
+    # Dla każdego pracownika brana jest najnowsza wysłana ankieta roku z oceną punktową managera.
+    latest_response = (
+        SurveyResponse.objects
+        .filter(
+            user=OuterRef("user"),
+            survey__year=year,
+            status="submitted",
+            score_summary__manager_scored__gt=0,
+        )
+        .order_by("-created_at", "-id")
+        .values("pk")[:1]
+    )
+    return (
+        SurveyResponse.objects
+        .filter(pk=Subquery(latest_response))
+        .annotate(
+            manager_percentage=MANAGER_PERCENTAGE,
+            company_rank=Window(expression=Rank(), order_by=MANAGER_PERCENTAGE.desc()),
+            percent_rank=Window(expression=PercentRank(), order_by=MANAGER_PERCENTAGE.asc()),
+            quartile=Window(expression=Ntile(4), order_by=MANAGER_PERCENTAGE.desc()),
+            department_rank=Window(
+                expression=Rank(),
+                partition_by=F("user__department_id"),
+                order_by=MANAGER_PERCENTAGE.desc(),
+            ),
+            department_size=Window(expression=Count("id"), partition_by=F("user__department_id")),
+        )
+        .select_related("user__department", "survey")
+        .order_by("company_rank", "user__last_name", "user__first_name", "id")
+    )
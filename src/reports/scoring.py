@@ -0,0 +1,100 @@
+# SERWIS PUNKTACJI KOMPETENCJI
+# Macierz wyników (odpowiedzi × kompetencje) liczona z jednego zapytania o wszystkie oceny ankiety
+# i odczyt tej macierzy z tabeli podsumowań
+
+import numpy as np
+
+from evaluations.models import EmployeeEvaluation
+from surveys.models import SurveyAnswer
+from surveys.scoring import MAX_SCALE_VALUE, competency_index
+
+from .models import CompetencyScoreSummary
+
+
+def score_triples(response_ids, score_type):
+    # Wszystkie trójki (response, question, scale_value) dla ankiety w jednym zapytaniu
+    if score_type == "employee":
+        return SurveyAnswer.objects.filter(
+            response_id__in=response_ids, scale_value__isnull=False
+        ).values_list("response_id", "question_id", "scale_value")
+    return EmployeeEvaluation.objects.filter(
+        employee_response_id__in=response_ids, scale_value__isnull=False
+    ).values_list("employee_response_id", "question_id", "scale_value")
+
+
+def competency_totals(response_ids, question_columns, column_count, score_type):
+    # Suma punktów w macierzy len(response_ids) × column_count
+    response_rows = {response_id: i for i, response_id in enumerate(response_ids)}
+    totals = np.zeros((len(response_rows), column_count), dtype=np.int64)
+    if not response_rows or not column_count:
+        return totals
+
+    rows, cols, values = [], [], []
+    for response_id, question_id, scale_value in score_triples(list(response_rows), score_type):
+        col = question_columns.get(question_id)
+        if col is None:
+            continue
+        rows.append(response_rows[response_id])
+        cols.append(col)
+        values.append(scale_value)
+    np.add.at(totals, (rows, cols), values)
+    return totals
+
+
+def competency_max_totals(question_columns, column_count):
+    # Maksymalna liczba punktów = liczba pytań kompetencji w ankiecie × 10
+    question_counts = np.bincount(list(question_columns.values()), minlength=column_count)
+    return question_counts, question_counts * MAX_SCALE_VALUE
+
+
+def to_percentages(totals, max_totals):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(max_totals > 0, totals / max_totals * 100, 0)
+
+
+def competency_score_matrix(survey, responses, score_type="employee"):
+    # Zwraca (nazwy kompetencji, macierz % o wymiarach len(responses) × len(kompetencje))
+    # Wartości pochodzą z przeliczonych podsumowań (CompetencyScoreSummary)
+    competency_ids, labels, _ = competency_index(survey)
+    columns = {competency_id: i for i, competency_id in enumerate(competency_ids)}
+    response_rows = {resp.id: i for i, resp in enumerate(responses)}
+
+    scores = np.zeros((len(response_rows), len(labels)))
+    if not response_rows or not labels:
+        return labels, scores
+
+    field = "self_percentage" if score_type == "employee" else "manager_percentage"
+    rows, cols, values = [], [], []
+    summaries = CompetencyScoreSummary.objects.filter(
+        response_id__in=list(response_rows)
+    ).values_list("response_id", "competency_id", field)
+    for response_id, competency_id, value in summaries:
+        col = columns.get(competency_id)
+        if col is None:
+            continue
+        rows.append(response_rows[response_id])
+        cols.append(col)
+        values.append(value)
+    scores[rows, cols] = values
+    return labels, scores
+
+
+def department_radar_scores(survey, responses, score_type="employee"):
+    # Wiersze pracowników + średnia działu dla raportu radarowego
+    responses = list(responses)
+    labels, scores = competency_score_matrix(survey, responses, score_type)
+
+    radar_data = [
+        {
+            "employee": resp.user.get_full_name(),
+            "scores": [round(score, 2) for score in row],
+        }
+        for resp, row in zip(responses, scores.tolist())
+    ]
+
+    avg_scores = []
+    if radar_data:
+        rounded = np.array([emp["scores"] for emp in radar_data])
+        avg_scores = [round(score, 2) for score in (rounded.sum(axis=0) / len(radar_data)).tolist()]
+
+    return labels, radar_data, avg_scores
@@ -0,0 +1,238 @@
+# GENERATOR SYNTETYCZNEJ ORGANIZACJI (dane do testów wydajności)
+# Działy, użytkownicy z rolami i team leaderami, kompetencje, pytania, ankiety z kilku lat
+# oraz wysłane odpowiedzi i oceny - wszystko przez bulk_create, deterministycznie dla danego seed.
+
+import math
+import random
+import uuid
+from datetime import datetime
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from evaluations.models import EmployeeEvaluation, EmployeeEvaluationHR
+from evaluations.rollups import refresh_status_rollups
+from surveys.models import Competency, Question, Survey, SurveyAnswer, SurveyQuestion, SurveyResponse
+from users.models import CustomUser, Department
+
+from .summaries import rebuild_all_summaries
+
+
+BULK_BATCH_SIZE = 1000
+EMPLOYEES_PER_DEPARTMENT = 50
+TEAM_SIZE = 8
+SEED_PASSWORD = "seed-org"
+
+FIRST_NAMES = [
+    "Anna", "Piotr", "Katarzyna", "Tomasz", "Magdalena", "Paweł", "Agnieszka", "Michał",
+    "Joanna", "Krzysztof", "Monika", "Marcin", "Ewa", "Jakub", "Aleksandra", "Łukasz",
+]
+LAST_NAMES = [
+    "Nowak", "Kowalski", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski",
+    "Zieliński", "Szymański", "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur",
+]
+# rola ankiety -> rola użytkowników, którzy ją wypełniają
+SURVEY_ROLES = ["employee", "team_leader", "manager"]
+
+
+def _aware(year, month, day):
+    return timezone.make_aware(datetime(year, month, day, 9, 0))
+
+
+def seeded_org_exists(prefix="seed"):
+    return (
+        Department.objects.filter(name__startswith=f"{prefix} ").exists()
+        or CustomUser.objects.filter(username__startswith=f"{prefix}_").exists()
+    )
+
+
+def clear_seeded_org(prefix="seed"):
+    # Usuwa dane wygenerowane z danym prefiksem (ankiety i odpowiedzi usuwane kaskadowo)
+    with transaction.atomic():
+        Department.objects.filter(name__startswith=f"{prefix} ").delete()
+        CustomUser.objects.filter(username__startswith=f"{prefix}_").delete()
+        Question.objects.filter(text__startswith=f"[{prefix}] ").delete()
+        Competency.objects.filter(name__startswith=f"{prefix} ").delete()
+
+
+def seed_org(employees=100, departments=None, years=3, last_year=None, competencies=8,
+             questions=40, questions_per_survey=15, seed=0, prefix="seed"):
+    rng = random.Random(seed)
+    last_year = last_year or timezone.now().year
+    survey_years = list(range(last_year - years + 1, last_year + 1))
+    departments = departments or max(1, math.ceil(employees / EMPLOYEES_PER_DEPARTMENT))
+    password = make_password(SEED_PASSWORD)
+    date_joined = _aware(survey_years[0] - 1, 1, 1)
+    counts = {
+        "departments": departments, "users": 0, "competencies": competencies, "questions": questions,
+        "surveys": 0, "responses": 0, "answers": 0, "evaluations": 0, "hr_evaluations": 0,
+    }
+
+    def new_user(username, role, department=None, team_leader=None, **extra):
+        return CustomUser(
+            username=username,
+            password=password,
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            email=f"{username}@example.com",
+            role=role,
+            department=department,
+            team_leader=team_leader,
+            date_joined=date_joined,
+            **extra,
+        )
+
+    with transaction.atomic():
+        # ---------- SŁOWNIKI: kompetencje i pytania ----------
+        competency_objs = Competency.objects.bulk_create([
+            Competency(name=f"{prefix} Kompetencja {i + 1:02d}") for i in range(competencies)
+        ])
+        question_objs = Question.objects.bulk_create([
+            Question(
+                text=f"[{prefix}] Pytanie {i + 1:03d}",
+                competency=competency_objs[i % competencies],
+                type=rng.choices([Question.SCALE, Question.BOTH, Question.TEXT], weights=[7, 2, 1])[0],
+                role="all",
+            )
+            for i in range(questions)
+        ])
+
+        # ---------- ORGANIZACJA: działy, admin, HR, managerowie, team leaderzy ----------
+        department_objs = Department.objects.bulk_create([
+            Department(name=f"{prefix} Dział {i + 1:03d}") for i in range(departments)
+        ])
+        admin, hr = CustomUser.objects.bulk_create([
+            new_user(f"{prefix}_admin", "admin", is_staff=True, is_superuser=True),
+            new_user(f"{prefix}_hr", "hr"),
+        ])
+
+        # pracownicy rozdzieleni równo między działy
+        sizes = [employees // departments + (1 if i < employees % departments else 0) for i in range(departments)]
+        managers = CustomUser.objects.bulk_create([
+            new_user(f"{prefix}_manager_{i + 1:03d}", "manager", department)
+            for i, department in enumerate(department_objs)
+        ], batch_size=BULK_BATCH_SIZE)
+        team_leaders = CustomUser.objects.bulk_create([
+            new_user(f"{prefix}_tl_{i + 1:03d}_{t + 1:02d}", "team_leader", department)
+            for i, (department, size) in enumerate(zip(department_objs, sizes))
+            for t in range(max(1, math.ceil(size / TEAM_SIZE)))
+        ], batch_size=BULK_BATCH_SIZE)
+
+        leaders_by_department = {}
+        for leader in team_leaders:
+            leaders_by_department.setdefault(leader.department_id, []).append(leader)
+
+        employee_objs = []
+        for i, (department, size) in enumerate(zip(department_objs, sizes)):
+            leaders = leaders_by_department[department.id]
+            for e in range(size):
+                employee_objs.append(new_user(
+                    f"{prefix}_emp_{i + 1:03d}_{e + 1:04d}", "employee", department,
+                    team_leader=leaders[e // TEAM_SIZE],
+                ))
+        employee_objs = CustomUser.objects.bulk_create(employee_objs, batch_size=BULK_BATCH_SIZE)
+        counts["users"] = 2 + len(managers) + len(team_leaders) + len(employee_objs)
+
+        # ---------- ANKIETY: dział × rok × rola ----------
+        survey_objs = []
+        for department in department_objs:
+            for year in survey_years:
+                for role in SURVEY_ROLES:
+                    survey_objs.append(Survey(
+                        name=f"Ocena roczna {year} – {department.name} ({role})",
+                        department=department,
+                        year=year,
+                        role=role,
+                        slug=uuid.UUID(int=rng.getrandbits(128), version=4),
+                    ))
+        survey_objs = Survey.objects.bulk_create(survey_objs, batch_size=BULK_BATCH_SIZE)
+        counts["surveys"] = len(survey_objs)
+
+        survey_questions = {}
+        links = []
+        for survey in survey_objs:
+            picked = rng.sample(question_objs, min(questions_per_survey, len(question_objs)))
+            survey_questions[survey.id] = picked
+            links.extend(
+                SurveyQuestion(survey=survey, question=question, order=order)
+                for order, question in enumerate(picked)
+            )
+        SurveyQuestion.objects.bulk_create(links, batch_size=BULK_BATCH_SIZE)
+
+        # ---------- ODPOWIEDZI I OCENY (partiami po dziale) ----------
+        users_by_department = {}
+        for user in [*managers, *team_leaders, *employee_objs]:
+            users_by_department.setdefault((user.department_id, user.role), []).append(user)
+        manager_by_department = {manager.department_id: manager for manager in managers}
+
+        surveys_by_department = {}
+        for survey in survey_objs:
+            surveys_by_department.setdefault(survey.department_id, []).append(survey)
+
+        for department in department_objs:
+            responses = []
+            for survey in surveys_by_department[department.id]:
+                for user in users_by_department.get((department.id, survey.role), []):
+                    status = "submitted" if rng.random() < 0.9 else "draft"
+                    responses.append(SurveyResponse(survey=survey, user=user, status=status))
+            responses = SurveyResponse.objects.bulk_create(responses, batch_size=BULK_BATCH_SIZE)
+
+            answers, evaluations, hr_evaluations = [], [], []
+            for response in responses:
+                for question in survey_questions[response.survey_id]:
+                    answers.append(SurveyAnswer(
+                        response=response,
+                        question=question,
+                        scale_value=rng.randint(0, 10) if question.type != Question.TEXT else None,
+                        text_value="Odpowiedź pracownika" if question.type != Question.SCALE else "",
+                    ))
+
+                if response.status != "submitted" or rng.random() >= 0.8:
+                    continue
+                # managera ocenia manager działu, managerów ocenia admin
+                evaluator = admin if response.user.role == "manager" else manager_by_department[department.id]
+                evaluation_status = "submitted" if rng.random() < 0.7 else "draft"
+                for question in survey_questions[response.survey_id]:
+                    evaluations.append(EmployeeEvaluation(
+                        employee_response=response,
+                        question=question,
+                        manager=evaluator,
+                        scale_value=rng.randint(0, 10) if question.type != Question.TEXT else None,
+                        text_value="Komentarz managera" if question.type != Question.SCALE else "",
+                        status=evaluation_status,
+                    ))
+                if evaluation_status == "submitted" and rng.random() < 0.5:
+                    hr_evaluations.append(EmployeeEvaluationHR(
+                        employee_response=response,
+                        comment="Komentarz HR",
+                        status="completed",
+                        completed_at=_aware(response.survey.year, 6, 1),
+                        created_by=hr,
+                    ))
+
+            SurveyAnswer.objects.bulk_create(answers, batch_size=BULK_BATCH_SIZE)
+            EmployeeEvaluation.objects.bulk_create(evaluations, batch_size=BULK_BATCH_SIZE)
+            EmployeeEvaluationHR.objects.bulk_create(hr_evaluations, batch_size=BULK_BATCH_SIZE)
+            counts["responses"] += len(responses)
+            counts["answers"] += len(answers)
+            counts["evaluations"] += len(evaluations)
+            counts["hr_evaluations"] += len(hr_evaluations)
+
+        # auto_now_add nadpisuje daty przy bulk_create - ustawiamy je per rok
+        seeded_surveys = Survey.objects.filter(department__name__startswith=f"{prefix} ")
+        for year in survey_years:
+            seeded_surveys.filter(year=year).update(created_at=_aware(year, 2, 1))
+            SurveyResponse.objects.filter(survey__in=seeded_surveys.filter(year=year)).update(
+                created_at=_aware(year, 3, 1), updated_at=_aware(year, 3, 1),
+            )
+
+        # statusy ocen na odpowiedziach (data wysłania oceny managera = data odpowiedzi)
+        refresh_status_rollups(SurveyResponse.objects.filter(survey__in=seeded_surveys), submitted_at=F("updated_at"))
+
+    # bulk_create nie wywołuje sygnałów - podsumowania punktów budujemy jawnie
+    rebuild_all_summaries(seeded_surveys)
+
+    counts.update({"admin": admin.username, "hr": hr.username, "years": survey_years})
+    return counts
@@ -0,0 +1,35 @@
+# Unieważnianie cache raportów - każda zmiana odpowiedzi lub ocen podbija wersję ankiety
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from evaluations.models import EmployeeEvaluation, EmployeeEvaluationHR
+from surveys.models import SurveyAnswer, SurveyResponse
+
+from .cache import bump_survey_version
+
+
+def _response_survey_id(instance, field_name):
+    # Bez dodatkowego zapytania, jeśli odpowiedź jest już wczytana (typowy zapis z widoku)
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        return getattr(instance, field_name).survey_id
+    return SurveyResponse.objects.filter(
+        pk=getattr(instance, field.attname)
+    ).values_list("survey_id", flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=SurveyResponse)
+def survey_response_changed(sender, instance, **kwargs):
+    bump_survey_version(instance.survey_id)
+
+
+@receiver([post_save, post_delete], sender=SurveyAnswer)
+def survey_answer_changed(sender, instance, **kwargs):
+    bump_survey_version(_response_survey_id(instance, "response"))
+
+
+@receiver([post_save, post_delete], sender=EmployeeEvaluation)
+@receiver([post_save, post_delete], sender=EmployeeEvaluationHR)
+def evaluation_changed(sender, instance, **kwargs):
+    bump_survey_version(_response_survey_id(instance, "employee_response"))
@@ -0,0 +1,135 @@
+# UTRZYMANIE TABEL PODSUMOWAŃ (ResponseScoreSummary / CompetencyScoreSummary)
+# Przeliczane przyrostowo po zapisie odpowiedzi lub ocen, pełna przebudowa: manage.py rebuild_score_summaries
+# Autozapis oceny managera tylko oznacza podsumowanie jako nieaktualne (stale_at) - przebudowa raz,
+# po oknie bez zmian, przy pełnym zapisie formularza albo przy odczycie raportu
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from evaluations.models import EmployeeEvaluation
+from surveys.models import Survey, SurveyAnswer
+from surveys.scoring import MAX_SCALE_VALUE, competency_index
+
+from .cache import bump_survey_version
+from .models import CompetencyScoreSummary, ResponseScoreSummary
+from .queries import percentage
+from .scoring import competency_max_totals, competency_totals, to_percentages
+
+
+def rebuild_survey_summaries(survey, response_ids):
+    # Przelicza podsumowania podanych odpowiedzi jednej ankiety stałą liczbą zapytań
+    response_ids = list(response_ids)
+    if not response_ids:
+        return 0
+
+    started_at = timezone.now()
+    competency_ids, labels, question_columns = competency_index(survey)
+    question_counts, max_totals = competency_max_totals(question_columns, len(labels))
+    self_totals = competency_totals(response_ids, question_columns, len(labels), "employee")
+    manager_totals = competency_totals(response_ids, question_columns, len(labels), "manager")
+    self_percentages = to_percentages(self_totals, max_totals)
+    manager_percentages = to_percentages(manager_totals, max_totals)
+
+    self_rows = {
+        row["response_id"]: row
+        for row in SurveyAnswer.objects.filter(response_id__in=response_ids)
+        .values("response_id")
+        .annotate(total=Sum("scale_value"), scored=Count("scale_value"))
+    }
+    manager_rows = {
+        row["employee_response_id"]: row
+        for row in EmployeeEvaluation.objects.filter(employee_response_id__in=response_ids)
+        .values("employee_response_id")
+        .annotate(total=Sum("scale_value"), scored=Count("scale_value"), evaluations=Count("id"))
+    }
+
+    summaries, competency_summaries = [], []
+    for i, response_id in enumerate(response_ids):
+        self_row = self_rows.get(response_id, {})
+        manager_row = manager_rows.get(response_id, {})
+        self_total = self_row.get("total") or 0
+        self_scored = self_row.get("scored", 0)
+        manager_total = manager_row.get("total") or 0
+        manager_scored = manager_row.get("scored", 0)
+
+        summaries.append(ResponseScoreSummary(
+            response_id=response_id,
+            self_total=self_total,
+            self_scored=self_scored,
+            self_percentage=percentage(self_total, self_scored * MAX_SCALE_VALUE),
+            manager_total=manager_total,
+            manager_scored=manager_scored,
+            manager_evaluations=manager_row.get("evaluations", 0),
+            manager_percentage=percentage(manager_total, manager_scored * MAX_SCALE_VALUE),
+        ))
+
+        for col, competency_id in enumerate(competency_ids):
+            competency_summaries.append(CompetencyScoreSummary(
+                response_id=response_id,
+                competency_id=competency_id,
+                question_count=int(question_counts[col]),
+                self_total=int(self_totals[i, col]),
+                self_percentage=round(float(self_percentages[i, col]), 2),
+                manager_total=int(manager_totals[i, col]),
+                manager_percentage=round(float(manager_percentages[i, col]), 2),
+            ))
+
+    with transaction.atomic():
+        # autozapis w trakcie przeliczania mógł nie zostać wliczony - jego znacznik zostaje
+        stale = dict(
+            ResponseScoreSummary.objects.select_for_update()
+            .filter(response_id__in=response_ids, stale_at__gt=started_at)
+            .values_list("response_id", "stale_at")
+        )
+        for summary in summaries:
+            summary.stale_at = stale.get(summary.response_id)
+        ResponseScoreSummary.objects.filter(response_id__in=response_ids).delete()
+        CompetencyScoreSummary.objects.filter(response_id__in=response_ids).delete()
+        ResponseScoreSummary.objects.bulk_create(summaries)
+        CompetencyScoreSummary.objects.bulk_create(competency_summaries)
+
+    # nowe podsumowania -> nieaktualne dane raportów w cache
+    bump_survey_version(survey.id)
+    return len(summaries)
+
+
+def refresh_response_summary(response):
+    # Wywoływane po każdym zapisie odpowiedzi pracownika lub ocen managera
+    return rebuild_survey_summaries(response.survey, [response.id])
+
+
+def mark_response_summary_stale(response):
+    # Autozapis: jedno UPDATE zamiast przebudowy; odpowiedź bez podsumowania przeliczamy od razu
+    if not ResponseScoreSummary.objects.filter(response=response).update(stale_at=timezone.now()):
+        refresh_response_summary(response)
+
+
+def rebuild_stale_summaries(quiet_for=None, **filters):
+    # Przebudowa podsumowań oznaczonych przez autozapis, grupami po ankiecie
+    # quiet_for - tylko odpowiedzi bez autozapisu od tylu sekund, filters - np. response__survey_id=...
+    stale = ResponseScoreSummary.objects.filter(stale_at__isnull=False, **filters)
+    if quiet_for is not None:
+        stale = stale.filter(stale_at__lte=timezone.now() - timedelta(seconds=quiet_for))
+
+    response_ids = defaultdict(list)
+    for survey_id, response_id in stale.values_list("response__survey_id", "response_id"):
+        response_ids[survey_id].append(response_id)
+
+    rebuilt = 0
+    for survey in Survey.objects.filter(id__in=response_ids):
+        rebuilt += rebuild_survey_summaries(survey, response_ids[survey.id])
+    return rebuilt
+
+
+def rebuild_all_summaries(surveys=None, batch_size=500):
+    surveys = surveys if surveys is not None else Survey.objects.all()
+    rebuilt = 0
+    for survey in surveys.order_by("id"):
+        response_ids = list(survey.surveyresponse_set.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(response_ids), batch_size):
+            rebuilt += rebuild_survey_summaries(survey, response_ids[start:start + batch_size])
+    return rebuilt
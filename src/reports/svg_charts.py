@@ -0,0 +1,160 @@
+# WYKRESY RADAROWE SVG (bez matplotlib)
+# Czyste budowanie napisu - deterministyczne (ten sam wynik dla tych samych danych) i bezpieczne dla wątków.
+# Wynik jako data URI <img src="..."> osadza zarówno przeglądarka, jak i wkhtmltopdf.
+
+import base64
+import math
+from xml.sax.saxutils import escape
+
+
+# Style odpowiadające dotychczasowym wykresom PDF:
+# "single" - wyniki ankiety pracownika, "user_manager" - pracownik vs manager
+RADAR_STYLES = {
+    "single": {
+        "size": 600,
+        "title": "WYKRES KOMPETENCJI",
+        "rings": range(20, 101, 20),
+        "ring_dash": None,
+        "spoke_color": "#b0b0b0",
+        "spoke_dash": None,
+        "font_size": 13,
+        "line_width": 2,
+        "fill_opacity": 0.1,
+        "legend": False,
+    },
+    "user_manager": {
+        "size": 700,
+        "title": None,
+        "rings": range(10, 101, 10),
+        "ring_dash": "4,3",
+        "spoke_color": "#808080",
+        "spoke_dash": "6,4",
+        "font_size": 15,
+        "line_width": 2.5,
+        "fill_opacity": 0.15,
+        "legend": True,
+    },
+}
+
+LABEL_WRAP = 16
+
+
+def _num(value):
+    # Stała liczba miejsc po przecinku - identyczny SVG niezależnie od platformy
+    return f"{value:.1f}"
+
+
+def _wrap(label):
+    lines, line = [], ""
+    for word in str(label).split():
+        if line and len(line) + len(word) + 1 > LABEL_WRAP:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + [line] if line else lines or [""]
+
+
+def _point(cx, cy, radius, angle):
+    # Kąt 0 u góry, kolejne osie zgodnie z ruchem wskazówek zegara (jak w dotychczasowych wykresach)
+    return cx + radius * math.sin(angle), cy - radius * math.cos(angle)
+
+
+def radar_svg(labels, series, style="single"):
+    # series - lista (nazwa, kolor, wartości 0-100); pusta lista wartości pomija serię
+    conf = RADAR_STYLES[style]
+    size, font_size = conf["size"], conf["font_size"]
+    n = len(labels)
+    if not n:
+        return None
+
+    top = font_size * 3 if conf["title"] else font_size
+    width, height = size + 2 * font_size * 8, size + top + font_size * 2
+    cx, cy = width / 2, top + size / 2
+    radius = size / 2 - font_size * 4
+    angles = [2 * math.pi * i / n for i in range(n)]
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_num(width)}" height="{_num(height)}" '
+        f'viewBox="0 0 {_num(width)} {_num(height)}" font-family="DejaVu Sans, Arial, sans-serif" font-size="{font_size}">',
+        f'<rect width="{_num(width)}" height="{_num(height)}" fill="#ffffff"/>',
+    ]
+
+    if conf["title"]:
+        parts.append(
+            f'<text x="{_num(cx)}" y="{_num(font_size * 1.8)}" text-anchor="middle" '
+            f'font-size="{font_size + 3}" font-weight="bold">{escape(conf["title"])}</text>'
+        )
+
+    # Siatka - okręgi co zadany procent i osie kompetencji
+    ring_dash = f' stroke-dasharray="{conf["ring_dash"]}"' if conf["ring_dash"] else ""
+    for ring in conf["rings"]:
+        parts.append(
+            f'<circle cx="{_num(cx)}" cy="{_num(cy)}" r="{_num(radius * ring / 100)}" fill="none" '
+            f'stroke="#b0b0b0" stroke-width="0.8"{ring_dash}/>'
+        )
+    spoke_dash = f' stroke-dasharray="{conf["spoke_dash"]}"' if conf["spoke_dash"] else ""
+    for angle in angles:
+        x, y = _point(cx, cy, radius, angle)
+        parts.append(
+            f'<line x1="{_num(cx)}" y1="{_num(cy)}" x2="{_num(x)}" y2="{_num(y)}" '
+            f'stroke="{conf["spoke_color"]}" stroke-width="0.8"{spoke_dash}/>'
+        )
+    for ring in conf["rings"]:
+        parts.append(
+            f'<text x="{_num(cx + 4)}" y="{_num(cy - radius * ring / 100 - 3)}" '
+            f'font-size="{font_size - 3}" fill="#555555">{ring}</text>'
+        )
+
+    # Serie danych
+    for name, color, values in series:
+        if not values:
+            continue
+        points = " ".join(
+            "{},{}".format(*map(_num, _point(cx, cy, radius * min(max(value or 0, 0), 100) / 100, angle)))
+            for value, angle in zip(values, angles)
+        )
+        parts.append(
+            f'<polygon points="{points}" fill="{color}" fill-opacity="{conf["fill_opacity"]}" '
+            f'stroke="{color}" stroke-width="{conf["line_width"]}" stroke-linejoin="round"/>'
+        )
+
+    # Etykiety osi - wyrównanie zależne od strony wykresu, długie nazwy łamane na kilka linii
+    for label, angle in zip(labels, angles):
+        x, y = _point(cx, cy, radius + font_size * 1.2, angle)
+        sin = math.sin(angle)
+        anchor = "middle" if abs(sin) < 0.1 else ("start" if sin > 0 else "end")
+        lines = _wrap(label)
+        line_height = font_size * 1.15
+        # etykiety u góry rosną w górę, u dołu w dół, po bokach są wyśrodkowane w pionie
+        cos = math.cos(angle)
+        if cos > 0.1:
+            first_y = y - (len(lines) - 1) * line_height
+        elif cos < -0.1:
+            first_y = y + font_size * 0.8
+        else:
+            first_y = y - (len(lines) - 1) * line_height / 2 + font_size * 0.35
+        tspans = "".join(
+            f'<tspan x="{_num(x)}" y="{_num(first_y + i * line_height)}">{escape(line)}</tspan>'
+            for i, line in enumerate(lines)
+        )
+        parts.append(f'<text text-anchor="{anchor}">{tspans}</text>')
+
+    if conf["legend"]:
+        legend = [(name, color) for name, color, values in series if values]
+        for i, (name, color) in enumerate(legend):
+            y = top + i * font_size * 1.6
+            parts.append(
+                f'<line x1="{_num(width - font_size * 10)}" y1="{_num(y)}" x2="{_num(width - font_size * 8)}" y2="{_num(y)}" '
+                f'stroke="{color}" stroke-width="{conf["line_width"]}"/>'
+            )
+            parts.append(
+                f'<text x="{_num(width - font_size * 7.5)}" y="{_num(y + font_size * 0.35)}">{escape(name)}</text>'
+            )
+
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def svg_data_uri(svg):
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode("utf-8")).decode("ascii")
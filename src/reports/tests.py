@@ -1,3 +1,144 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from evaluations.models import EmployeeEvaluation
+from evaluations.rollups import refresh_response_status
+from surveys.models import Competency, Question, Survey, SurveyAnswer, SurveyQuestion, SurveyResponse
+from users.models import CustomUser, Department
+
+from .cache import get_cache, survey_version
+from .models import PDFPack
+from .summaries import refresh_response_summary
+
+
+class ReportTestData(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Sprzedaż")
+        cls.other_department = Department.objects.create(name="Produkcja")
+        cls.hr = CustomUser.objects.create_user("hr", password="pass", role="hr")
+        cls.manager = CustomUser.objects.create_user("manager", password="pass", role="manager", department=cls.department)
+        cls.other_manager = CustomUser.objects.create_user(
+            "other_manager", password="pass", role="manager", department=cls.other_department
+        )
+        cls.employee = CustomUser.objects.create_user(
+            "employee", password="pass", role="employee", department=cls.department, first_name="Jan", last_name="Nowak"
+        )
+
+        competency = Competency.objects.create(name="Komunikacja")
+        cls.survey = Survey.objects.create(name="Ocena roczna", department=cls.department, role="employee")
+        cls.questions = [
+            Question.objects.create(text=f"Pytanie {i}", competency=competency, role="employee") for i in (1, 2)
+        ]
+        for order, question in enumerate(cls.questions):
+            SurveyQuestion.objects.create(survey=cls.survey, question=question, order=order)
+
+        cls.response = SurveyResponse.objects.create(survey=cls.survey, user=cls.employee, status="submitted")
+        for question in cls.questions:
+            SurveyAnswer.objects.create(response=cls.response, question=question, scale_value=5)
+
+
+class BulkWriteInvalidationTests(ReportTestData):
+    def radar_data(self):
+        return self.client.get(reverse("department_radar_report_data"), {
+            "survey": self.survey.id, "department": self.department.id, "score_type": "manager",
+        }).json()
+
+    def test_bulk_evaluation_save_changes_report(self):
+        self.client.force_login(self.hr)
+        before = self.radar_data()
+
+        self.client.force_login(self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("manager_evaluate_employee", args=[self.response.id]), {
+                "save_type": "submitted",
+                **{f"manager_scale_{question.id}": 10 for question in self.questions},
+            })
+
+        self.client.force_login(self.hr)
+        after = self.radar_data()
+        self.assertNotEqual(before, after)
+        self.assertEqual(after["avg_scores"], [100.0])
+
+    def test_status_rollup_bumps_survey_version(self):
+        EmployeeEvaluation.objects.bulk_create([
+            EmployeeEvaluation(
+                employee_response=self.response, question=question, manager=self.manager, scale_value=7, status="draft"
+            )
+            for question in self.questions
+        ])
+        version = survey_version(self.survey.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_response_status(self.response)
+        self.assertNotEqual(survey_version(self.survey.id), version)
+
+
+class ExportAccessTests(ReportTestData):
+    def test_manager_from_other_department_cannot_export(self):
+        self.client.force_login(self.other_manager)
+        for name in ("export_results_csv", "export_results_xlsx"):
+            response = self.client.get(reverse(name), {"survey": self.survey.id})
+            self.assertEqual(response.status_code, 403, name)
+
+    def test_manager_cannot_use_pdf_packs(self):
+        pack = PDFPack.objects.create(survey=self.survey, year=self.survey.year, requested_by=self.hr)
+        self.client.force_login(self.other_manager)
+        self.assertEqual(self.client.post(reverse("pdf_pack_create"), {"survey": self.survey.id}).status_code, 403)
+        self.assertEqual(self.client.get(reverse("pdf_pack_detail", args=[pack.id])).status_code, 403)
+        self.assertEqual(self.client.get(reverse("pdf_pack_download", args=[pack.id])).status_code, 403)
+        self.assertEqual(PDFPack.objects.count(), 1)
+
+    def test_hr_can_export(self):
+        self.client.force_login(self.hr)
+        response = self.client.get(reverse("export_results_csv"), {"survey": self.survey.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Nowak", b"".join(response.streaming_content).decode("utf-8"))
+
+
+class ReportDataETagTests(ReportTestData):
+    def get_radar(self, **headers):
+        return self.client.get(reverse("department_radar_report_data"), {
+            "survey": self.survey.id, "department": self.department.id,
+        }, headers=headers)
+
+    def test_etag_is_content_hash(self):
+        refresh_response_summary(self.response)
+        self.client.force_login(self.hr)
+        response = self.get_radar()
+        etag = response["ETag"]
+        self.assertNotIn("reports:", etag)
+
+        # ta sama treść po wyczyszczeniu cache (inny proces, restart) - ten sam ETag
+        get_cache().clear()
+        self.assertEqual(self.get_radar()["ETag"], etag)
+        self.assertEqual(self.get_radar(if_none_match=etag).status_code, 304)
+
+    def test_changed_data_changes_etag(self):
+        refresh_response_summary(self.response)
+        self.client.force_login(self.hr)
+        etag = self.get_radar()["ETag"]
+
+        SurveyAnswer.objects.filter(response=self.response).update(scale_value=9)
+        refresh_response_summary(self.response)
+        response = self.get_radar(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class YearParamTests(ReportTestData):
+    def setUp(self):
+        self.client.force_login(self.hr)
+
+    def test_invalid_year_in_ranking_falls_back_to_latest_year(self):
+        response = self.client.get(reverse("ranking_report"), {"year": "abc"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["selected_year"], str(self.survey.year))
+
+    def test_invalid_year_returns_400(self):
+        for year in ("abc", "0", "99999999999999999999"):
+            self.assertEqual(self.client.get(reverse("latest_survey_report_data"), {"year": year}).status_code, 400)
+            self.assertEqual(self.client.get(reverse("export_results_csv"), {"year": year}).status_code, 400)
+            response = self.client.post(reverse("pdf_pack_create"), {"department": self.department.id, "year": year})
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(PDFPack.objects.exists())
+        self.assertEqual(self.client.get(reverse("latest_survey_report_data"), {"year": self.survey.year}).status_code, 200)
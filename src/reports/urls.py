@@ -5,7 +5,25 @@ urlpatterns = [
     path('', views.reports_home, name='reports_home'),
     path('department/', views.department_report, name='department_report'),
     path('employee/', views.employee_report, name='employee_report'),
+    path('employee/<int:employee_id>/trend/', views.employee_trend_data, name='employee_trend'),
     path('latest-survey-report/', views.latest_survey_report, name='latest_survey_report'),
+    path('ranking/', views.ranking_report, name='ranking_report'),
     path('get-surveys/', views.get_surveys, name='get_surveys'),
     path('department/radar/', views.department_radar_report, name='department_radar_report'),
+    path('export/csv/', views.export_results_csv, name='export_results_csv'),
+    path('export/xlsx/', views.export_results_xlsx, name='export_results_xlsx'),
+
+    # Dane wykresów (JSON) pobierane przez strony raportów
+    path('data/department/', views.department_report_data, name='department_report_data'),
+    path('data/department/radar/', views.department_radar_report_data, name='department_radar_report_data'),
+    path('data/employee/', views.employee_report_data, name='employee_report_data'),
+    path('data/latest-survey/', views.latest_survey_report_data, name='latest_survey_report_data'),
+
+    # Status zlecenia PDF generowanego w tle (HTMX)
+    path('pdf-jobs/<int:job_id>/', views.pdf_job_status, name='pdf_job_status'),
+
+    # Paczki PDF (ZIP) ankiety lub działu
+    path('pdf-packs/', views.pdf_pack_create, name='pdf_pack_create'),
+    path('pdf-packs/<int:pack_id>/', views.pdf_pack_detail, name='pdf_pack_detail'),
+    path('pdf-packs/<int:pack_id>/download/', views.pdf_pack_download, name='pdf_pack_download'),
 ]
\ No newline at end of file
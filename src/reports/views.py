@@ -3,19 +3,30 @@ from django.contrib.auth.decorators import login_required
 from users.models import Department, CustomUser
 
 
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from users.models import Department, CustomUser
 from evaluations.models import EmployeeEvaluation
 from surveys.models import Survey, SurveyResponse
 
-from django.http import JsonResponse
+from django.http import FileResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 
 from surveys.models import Survey, SurveyResponse, SurveyAnswer, Competency
 
 from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_POST
+from django.utils.cache import get_conditional_response, set_response_etag
 from functools import wraps
 
+from .datasets import department_chart, department_radar, employee_chart, latest_survey_chart
+from .exports import csv_stream, export_responses, export_rows, write_xlsx
+from .models import PDFJob, PDFPack
+from .pdf_jobs import pack_filename, pack_zip_stream, pdf_url
+from .queries import employee_ranking, employee_trend
+from .summaries import rebuild_stale_summaries
+
 def hr_or_admin_required(view_func):
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
@@ -26,6 +37,25 @@ def hr_or_admin_required(view_func):
         return view_func(request, *args, **kwargs)
     return wrapper
 
+# Eksport i paczki PDF obejmują wyniki wszystkich działów - tylko HR i administrator (bez managerów)
+def admin_hr_required(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        user = request.user
+        if user.is_superuser or getattr(user, 'role', '') in ['admin', 'hr']:
+            return view_func(request, *args, **kwargs)
+        raise PermissionDenied("Dostęp tylko dla administratora lub HR")
+    return wrapper
+
+# Rok z parametru żądania - pusty = brak roku, nieliczbowy lub spoza zakresu rzuca ValueError
+def _year_param(value):
+    if not value:
+        return None
+    year = int(value)
+    if not 0 < year < 10000:
+        raise ValueError(value)
+    return year
+
 @login_required
 @hr_or_admin_required
 def get_surveys(request):
@@ -40,7 +70,7 @@ def get_surveys(request):
     return render(
         request,
         "reports/partials/_survey_options.html",
-        {"surveys": surveys, "selected_survey_id": selected_survey_id},
+        {"surveys": surveys, "selected_survey_id": selected_survey_id, "allow_all": request.GET.get("allow_all")},
     )
 
 @login_required
@@ -81,46 +111,15 @@ def department_report(request):
     survey_id = request.GET.get("survey")  # teraz pobieramy wybraną ankietę
     selected_department = None
     current_survey = None
-    chart_labels, chart_values = [], []
 
+    # dane wykresu pobiera strona z department_report_data
     if department_id and survey_id:
         selected_department = get_object_or_404(Department, id=department_id)
         current_survey = get_object_or_404(Survey, id=survey_id)
-        employees = CustomUser.objects.filter(department=selected_department)
-
-        for emp in employees:
-            emp_response = (
-                SurveyResponse.objects
-                .filter(user=emp, survey=current_survey, status="submitted")
-                .order_by('-created_at')
-                .first()
-            )
-            if not emp_response:
-                continue
-
-            manager_answers = EmployeeEvaluation.objects.filter(employee_response=emp_response)
-            if not manager_answers.exists():
-                continue
-
-            manager_scored = [a.scale_value for a in manager_answers if a.scale_value is not None]
-            manager_total_points = sum(manager_scored)
-            manager_max_points = len(manager_scored) * 10 if manager_scored else 0
-            manager_percentage = round((manager_total_points / manager_max_points) * 100, 2) if manager_max_points else 0
-
-            chart_labels.append(f"{emp.first_name} {emp.last_name}")
-            chart_values.append(manager_percentage)
-
-        if chart_labels:
-            chart_data = sorted(zip(chart_labels, chart_values), key=lambda x: x[1], reverse=True)
-            chart_labels, chart_values = zip(*chart_data)
-            chart_labels = list(chart_labels)
-            chart_values = list(chart_values)
 
     context = {
         "selected_department": selected_department,
         "current_survey": current_survey,
-        "chart_labels": chart_labels,
-        "chart_values": chart_values,
     }
 
     return render(request, "reports/department_report.html", context)
@@ -129,7 +128,6 @@ def department_report(request):
 @hr_or_admin_required
 def department_radar_report(request):
     department_id = request.GET.get("department")
-    year = request.GET.get("year")
     survey_id = request.GET.get("survey")
     score_type = request.GET.get("score_type", "employee")  # "employee" lub "manager"
 
@@ -142,70 +140,19 @@ def department_radar_report(request):
 
     selected_department = None
     current_survey = None
-    radar_labels = []
-    radar_data = []
-    avg_scores = []
 
+    # wyniki kompetencji i średnią działu pobiera strona z department_radar_report_data
     if department_id and survey_id:
         # Pobierz ankietę
         current_survey = get_object_or_404(Survey, id=survey_id)
         selected_department = current_survey.department
 
-        # Pobierz wszystkich pracowników, którzy wzięli udział w ankiecie
-        responses = SurveyResponse.objects.filter(
-            survey=current_survey,
-            user__department_id=department_id,
-            status="submitted"
-        )
-
-        competencies = list(
-            Competency.objects.filter(
-                questions__surveyquestion__survey=current_survey
-            ).distinct()
-        )
-
-        radar_labels = [c.name for c in competencies]
-
-        for resp in responses:
-            if score_type == "employee":
-                answers = SurveyAnswer.objects.filter(response=resp)
-            else:  # manager
-                answers = EmployeeEvaluation.objects.filter(employee_response=resp)
-
-            # Oblicz wynik dla każdej kompetencji
-            scores = []
-            for comp in competencies:
-                comp_questions = current_survey.surveyquestion_set.filter(question__competency=comp)
-                if comp_questions.exists():
-                    max_total = len(comp_questions) * 10
-                    total = sum(
-                        [a.scale_value for a in answers if a.question in [q.question for q in comp_questions] and a.scale_value]
-                    )
-                    scores.append(round(total / max_total * 100, 2) if max_total else 0)
-                else:
-                    scores.append(0)
-
-            radar_data.append({
-                "employee": resp.user.get_full_name(),
-                "scores": scores
-            })
-
-        # 🔹 Obliczenie średniej dla działu
-        if radar_data:
-            num_employees = len(radar_data)
-            avg_scores = [
-                round(sum(emp["scores"][i] for emp in radar_data) / num_employees, 2)
-                for i in range(len(radar_labels))
-            ]
-
     return render(request, "reports/department_radar_report.html", {
         "selected_department": selected_department,
         "current_survey": current_survey,
-        "radar_labels": radar_labels,
-        "radar_data": radar_data,
+        "department_id": department_id,
         "score_type": score_type,
         "score_type_display": score_type_display,  # <- teraz przyjazna nazwa
-        "avg_scores": avg_scores
     })
 
 @login_required
@@ -213,101 +160,228 @@ def department_radar_report(request):
 def employee_report(request):
     employee_id = request.GET.get("employee")
     selected_employee = None
-    chart_labels, chart_values = [], []
 
+    # dane wykresu pobiera strona z employee_report_data
     if employee_id:
         selected_employee = get_object_or_404(CustomUser, id=employee_id)
 
-        # pobierz wszystkie wypełnione ankiety pracownika, od najnowszej do najstarszej
-        responses = SurveyResponse.objects.filter(user=selected_employee, status="submitted").order_by('-created_at')
+    context = {
+        "selected_employee": selected_employee,
+    }
+    return render(request, "reports/employee_report.html", context)
+
+
+
+# DANE RAPORTÓW (JSON) - strony raportów renderują się od razu, wykresy pobierają dane osobno.
+# ETag = skrót treści JSON - ten sam w każdym procesie i po restarcie, zmienia się tylko ze zmianą danych.
+# Dane i tak pochodzą z cache raportów, a przy zgodnym If-None-Match odpowiedź to 304 bez treści.
+def content_etag(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if request.method not in ("GET", "HEAD") or response.status_code != 200:
+            return response
+        set_response_etag(response)
+        return get_conditional_response(request, etag=response.get("ETag"), response=response)
+    return wrapper
+
 
-        for response in responses:
-            manager_answers = EmployeeEvaluation.objects.filter(employee_response=response)
+@login_required
+@hr_or_admin_required
+@cache_control(private=True, no_cache=True)
+@content_etag
+def department_report_data(request):
+    selected_department = get_object_or_404(Department, id=request.GET.get("department"))
+    current_survey = get_object_or_404(Survey, id=request.GET.get("survey"))
+    return JsonResponse(department_chart(current_survey, selected_department))
 
-            if not manager_answers.exists():
-                continue
 
-            manager_scored = [a.scale_value for a in manager_answers if a.scale_value is not None]
-            manager_total_points = sum(manager_scored)
-            manager_max_points = len(manager_scored) * 10 if manager_scored else 0
-            manager_percentage = round((manager_total_points / manager_max_points) * 100, 2) if manager_max_points else 0
+@login_required
+@hr_or_admin_required
+@cache_control(private=True, no_cache=True)
+@content_etag
+def department_radar_report_data(request):
+    current_survey = get_object_or_404(Survey, id=request.GET.get("survey"))
+    department_id = request.GET.get("department")
+    score_type = request.GET.get("score_type", "employee")
+    return JsonResponse(department_radar(current_survey, department_id, score_type))
 
-            # zamiast daty dodajemy nazwę ankiety
-            chart_labels.append(response.survey.name)
-            chart_values.append(manager_percentage)
 
-        # konwersja na listy, aby JS poprawnie odczytał dane
-        chart_labels = list(chart_labels)
-        chart_values = list(chart_values)
+@login_required
+@hr_or_admin_required
+@cache_control(private=True, no_cache=True)
+@content_etag
+def employee_report_data(request):
+    selected_employee = get_object_or_404(CustomUser, id=request.GET.get("employee"))
+    return JsonResponse(employee_chart(selected_employee))
+
 
-    context = {
-        "selected_employee": selected_employee,
-        "chart_labels": chart_labels,
-        "chart_values": chart_values,
-    }
-    return render(request, "reports/employee_report.html", context)
+@login_required
+@hr_or_admin_required
+@cache_control(private=True, no_cache=True)
+@content_etag
+def latest_survey_report_data(request):
+    try:
+        year = _year_param(request.GET.get("year"))
+    except ValueError:
+        return HttpResponseBadRequest("Nieprawidłowy rok.")
+    return JsonResponse(latest_survey_chart(year))
+
+# TREND PRACOWNIKA - wyniki ogólne i kompetencji ze wszystkich ankiet + zmiany rok do roku (JSON)
+@login_required
+@hr_or_admin_required
+def employee_trend_data(request, employee_id):
+    employee = get_object_or_404(CustomUser, id=employee_id)
+    rebuild_stale_summaries(response__user=employee)
+    return JsonResponse(employee_trend(employee))
 
 
 @login_required
 @hr_or_admin_required
 def latest_survey_report(request):
-    labels = []
-    manager_scores = []
-    departments_checked = []
-
-    departments = Department.objects.all()
-
-    for dept in departments:
-        employees = CustomUser.objects.filter(department=dept, role="employee")
-
-        latest_response = (
-            SurveyResponse.objects
-            .filter(user__in=employees, status="submitted")
-            .order_by('-created_at')
-            .select_related('survey')
-            .first()
-        )
-
-        if not latest_response:
-            continue
-
-        latest_survey = latest_response.survey
-        departments_checked.append(f"{dept.name} ({latest_survey.name})")
-
-        for emp in employees:
-            emp_response = (
-                SurveyResponse.objects
-                .filter(user=emp, survey=latest_survey, status="submitted")
-                .order_by('-created_at')
-                .first()
-            )
-            if not emp_response:
-                continue
-
-            manager_answers = EmployeeEvaluation.objects.filter(employee_response=emp_response)
-            if not manager_answers.exists():
-                continue
-
-            manager_values = [a.scale_value for a in manager_answers if a.scale_value is not None]
-            if not manager_values:
-                continue
-
-            avg_manager_score = round((sum(manager_values) / len(manager_values)) * 10, 2)
-
-            labels.append(f"{emp.first_name} {emp.last_name} ({dept.name})")
-            manager_scores.append(avg_manager_score)
-
-    # 🔹 sortowanie od najwyższej do najniższej oceny
-    if labels and manager_scores:
-        sorted_pairs = sorted(zip(manager_scores, labels), reverse=True)
-        manager_scores, labels = map(list, zip(*sorted_pairs))  # zawsze listy
-    else:
-        manager_scores, labels = [], []
+    # dane wykresu pobiera strona z latest_survey_report_data
+    selected_year = request.GET.get("year") or None
 
     context = {
-        "chart_labels": labels,
-        "manager_scores": manager_scores,
-        "departments_checked": departments_checked,
+        "selected_year": selected_year,
     }
 
-    return render(request, "reports/latest_survey_report.html", context)
\ No newline at end of file
+    return render(request, "reports/latest_survey_report.html", context)
+
+
+
+
+# RANKING PRACOWNIKÓW FIRMY - pozycja, percentyl, kwartyl i miejsce w dziale (funkcje okna w bazie)
+RANKING_PAGE_SIZE = 50
+
+@login_required
+@hr_or_admin_required
+def ranking_report(request):
+    years = Survey.objects.values_list("year", flat=True).distinct().order_by("-year")
+    # nieprawidłowy rok w adresie = domyślnie najnowszy rok, jak bez parametru
+    try:
+        selected_year = _year_param(request.GET.get("year"))
+    except ValueError:
+        selected_year = None
+    selected_year = selected_year or (years[0] if years else None)
+
+    page_obj = None
+    if selected_year:
+        # ranking liczony z podsumowań - najpierw przeliczamy te oznaczone przez autozapis
+        rebuild_stale_summaries(response__survey__year=selected_year)
+        paginator = Paginator(employee_ranking(selected_year), RANKING_PAGE_SIZE)
+        page_obj = paginator.get_page(request.GET.get("page"))
+        for row in page_obj:
+            row.percentile = round(row.percent_rank * 100, 1)
+
+    return render(request, "reports/ranking_report.html", {
+        "years": years,
+        "selected_year": str(selected_year) if selected_year else None,
+        "page_obj": page_obj,
+    })
+
+# EKSPORT WYNIKÓW ANKIET - cała ankieta (?survey=) lub cały rok (?year=)
+def _export_params(request):
+    survey_id = request.GET.get("survey") or None
+    year = _year_param(request.GET.get("year"))
+    filename = f"wyniki_ankieta_{survey_id}" if survey_id else f"wyniki_{year}"
+    return survey_id, year, filename
+
+
+@login_required
+@admin_hr_required
+def export_results_csv(request):
+    try:
+        survey_id, year, filename = _export_params(request)
+    except ValueError:
+        return HttpResponseBadRequest("Nieprawidłowy rok.")
+    if not (survey_id or year):
+        return HttpResponseBadRequest("Wybierz ankietę lub rok.")
+
+    rows = export_rows(export_responses(survey_id, year))
+    response = StreamingHttpResponse(csv_stream(rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+@login_required
+@admin_hr_required
+def export_results_xlsx(request):
+    try:
+        survey_id, year, filename = _export_params(request)
+    except ValueError:
+        return HttpResponseBadRequest("Nieprawidłowy rok.")
+    if not (survey_id or year):
+        return HttpResponseBadRequest("Wybierz ankietę lub rok.")
+
+    output = write_xlsx(export_rows(export_responses(survey_id, year)))
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f"{filename}.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
+# STATUS ZLECENIA PDF (HTMX) - odpytywany przez stronę oczekiwania na PDF
+# Sam status nie ujawnia treści - pobranie pliku przechodzi przez widok PDF z jego kontrolą dostępu
+@login_required
+def pdf_job_status(request, job_id):
+    job = get_object_or_404(PDFJob.objects.select_related("response__survey"), id=job_id)
+    user = request.user
+    if not (
+        user.is_superuser
+        or getattr(user, 'role', '') in ['manager', 'team_leader', 'hr', 'admin']
+        or user.id in (job.requested_by_id, job.response.user_id)
+    ):
+        raise PermissionDenied
+
+    return render(request, "reports/partials/_pdf_job_status.html", {
+        "job": job,
+        "pdf_url": pdf_url(job.kind, job.response),
+    })
+
+
+# PACZKA PDF (ZIP) - podglądy ocen managera wszystkich wysłanych odpowiedzi ankiety albo działu w danym roku
+# Renderowanie w pdf_worker, strona paczki odpytuje postęp przez HTMX, ZIP strumieniowany z plików na dysku
+@login_required
+@admin_hr_required
+@require_POST
+def pdf_pack_create(request):
+    survey_id = request.POST.get("survey") or None
+    department_id = request.POST.get("department") or None
+    try:
+        year = _year_param(request.POST.get("year"))
+    except ValueError:
+        return HttpResponseBadRequest("Nieprawidłowy rok.")
+
+    if survey_id:
+        survey = get_object_or_404(Survey, id=survey_id)
+        pack = PDFPack.objects.create(survey=survey, year=survey.year, requested_by=request.user)
+    elif department_id and year:
+        department = get_object_or_404(Department, id=department_id)
+        pack = PDFPack.objects.create(department=department, year=year, requested_by=request.user)
+    else:
+        return HttpResponseBadRequest("Wybierz ankietę albo dział i rok.")
+
+    return redirect("pdf_pack_detail", pack_id=pack.id)
+
+
+@login_required
+@admin_hr_required
+def pdf_pack_detail(request, pack_id):
+    pack = get_object_or_404(PDFPack.objects.select_related("survey", "department"), id=pack_id)
+    template = "reports/partials/_pdf_pack_status.html" if request.headers.get("HX-Request") else "reports/pdf_pack.html"
+    return render(request, template, {"pack": pack})
+
+
+@login_required
+@admin_hr_required
+def pdf_pack_download(request, pack_id):
+    pack = get_object_or_404(PDFPack.objects.select_related("survey", "department"), id=pack_id)
+    if pack.status != "done":
+        return redirect("pdf_pack_detail", pack_id=pack.id)
+
+    response = StreamingHttpResponse(pack_zip_stream(pack), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="{pack_filename(pack)}"'
+    return response
@@ -0,0 +1,29 @@
+// RAPORTY - pobieranie danych wykresów (JSON) po załadowaniu strony.
+// Przeglądarka sama wysyła If-None-Match, więc niezmienione dane wracają jako 304.
+
+function fetchReportData(url) {
+    return fetch(url, {
+        credentials: 'same-origin',
+        headers: { 'Accept': 'application/json' }
+    }).then(response => {
+        if (!response.ok) {
+            throw new Error('Błąd pobierania danych raportu: ' + response.status);
+        }
+        return response.json();
+    });
+}
+
+// Kilka wykresów na jednej stronie - wszystkie zapytania równolegle
+function fetchReportDataAll(urls) {
+    return Promise.all(urls.map(fetchReportData));
+}
+
+// Przełącza widoczność: ładowanie / wykres / brak danych
+function showReportState(prefix, state) {
+    ['loading', 'chart', 'empty', 'error'].forEach(name => {
+        const el = document.getElementById(prefix + '-' + name);
+        if (el) {
+            el.classList.toggle('d-none', name !== state);
+        }
+    });
+}
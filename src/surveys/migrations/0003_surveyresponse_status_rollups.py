@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveyresponse',
+            name='hr_completed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='surveyresponse',
+            name='hr_status',
+            field=models.CharField(blank=True, choices=[('draft', 'Draft'), ('completed', 'Completed')], db_index=True, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='surveyresponse',
+            name='manager_status',
+            field=models.CharField(blank=True, choices=[('draft', 'W trakcie oceny'), ('submitted', 'Zakończona')], db_index=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='surveyresponse',
+            name='manager_submitted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
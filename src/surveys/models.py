@@ -94,7 +94,22 @@ class SurveyResponse(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft")
-    hr_comment = models.TextField(blank=True) 
+    hr_comment = models.TextField(blank=True)
+
+    # Statusy ocen utrzymywane przy zapisie ocen managera i komentarza HR (evaluations.rollups)
+    MANAGER_STATUS_CHOICES = [
+        ("draft", "W trakcie oceny"),
+        ("submitted", "Zakończona"),
+    ]
+    HR_STATUS_CHOICES = [
+        ("draft", "Draft"),
+        ("completed", "Completed"),
+    ]
+
+    manager_status = models.CharField(max_length=20, choices=MANAGER_STATUS_CHOICES, null=True, blank=True, db_index=True)
+    manager_submitted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    hr_status = models.CharField(max_length=10, choices=HR_STATUS_CHOICES, null=True, blank=True, db_index=True)
+    hr_completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"{self.user} → {self.survey} ({self.get_status_display()})"
@@ -0,0 +1,41 @@
+# WIERSZE PYTAŃ DO SZABLONÓW WYNIKÓW
+# Jedna uporządkowana lista (pytanie, kompetencja, odpowiedź pracownika, ocena managera) budowana w widoku -
+# odpowiedzi grupowane słownikiem po question_id, szablon iteruje listę raz zamiast szukać dopasowań w pętli
+
+from .models import SurveyQuestion
+
+
+class AnswerRow:
+    __slots__ = ("question", "competency", "answers", "manager_answers")
+
+    def __init__(self, question, answers, manager_answers):
+        self.question = question
+        self.competency = question.competency
+        self.answers = answers
+        self.manager_answers = manager_answers
+
+    @property
+    def answer(self):
+        return self.answers[0] if self.answers else None
+
+    @property
+    def manager_answer(self):
+        return self.manager_answers[0] if self.manager_answers else None
+
+
+def _group_by_question(answers):
+    grouped = {}
+    for answer in answers:
+        grouped.setdefault(answer.question_id, []).append(answer)
+    return grouped
+
+
+def answer_rows(survey, answers, manager_answers=()):
+    # Kolejność pytań ankiety (SurveyQuestion.order); kilka ocen do jednego pytania (np. dwóch oceniających) zostaje zachowanych
+    answers = _group_by_question(answers)
+    manager_answers = _group_by_question(manager_answers)
+    questions = SurveyQuestion.objects.filter(survey=survey).select_related("question__competency")
+    return [
+        AnswerRow(sq.question, answers.get(sq.question_id, []), manager_answers.get(sq.question_id, []))
+        for sq in questions
+    ]
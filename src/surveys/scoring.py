@@ -0,0 +1,60 @@
+# SERWIS PUNKTACJI KOMPETENCJI ANKIETY
+# Indeks pytanie -> kompetencja budowany raz dla ankiety (jedno zapytanie),
+# a odpowiedzi pracownika i oceny managera punktowane w jednym przebiegu po question_id
+
+from collections import Counter
+
+from .models import SurveyQuestion
+
+
+MAX_SCALE_VALUE = 10
+
+
+def competency_index(survey):
+    # Kompetencje ankiety w kolejności pytań (kolumny) + mapa question_id -> numer kolumny
+    # Wspólne dla strony wyników, podglądu oceny, PDF i raportów radarowych - te same osie wykresów
+    competency_ids, labels, question_columns = [], [], {}
+    columns = {}
+    rows = SurveyQuestion.objects.filter(
+        survey=survey, question__competency__isnull=False
+    ).order_by("order", "id").values_list("question_id", "question__competency_id", "question__competency__name")
+
+    for question_id, competency_id, competency_name in rows:
+        if competency_id not in columns:
+            columns[competency_id] = len(labels)
+            competency_ids.append(competency_id)
+            labels.append(competency_name)
+        question_columns[question_id] = columns[competency_id]
+
+    return competency_ids, labels, question_columns
+
+
+class CompetencyIndex:
+    # competency_index ankiety + maksymalna liczba punktów każdej kompetencji
+    def __init__(self, survey):
+        self.competency_ids, self.labels, self.question_columns = competency_index(survey)
+        question_counts = Counter(self.question_columns.values())
+        self.max_totals = [question_counts[col] * MAX_SCALE_VALUE for col in range(len(self.labels))]
+
+    def totals(self, answers):
+        # answers - obiekty z question_id i scale_value (SurveyAnswer / EmployeeEvaluation)
+        totals = [0] * len(self.labels)
+        for answer in answers:
+            col = self.question_columns.get(answer.question_id)
+            if col is not None and answer.scale_value is not None:
+                totals[col] += answer.scale_value
+        return totals
+
+    def percentages(self, answers):
+        return [
+            round(total / max_total * 100, 2) if max_total else 0
+            for total, max_total in zip(self.totals(answers), self.max_totals)
+        ]
+
+
+def competency_scores(survey, answers, manager_answers=None):
+    # (nazwy kompetencji, % pracownika, % managera) - manager_answers=None pomija ocenę managera
+    index = CompetencyIndex(survey)
+    user_values = index.percentages(answers)
+    manager_values = index.percentages(manager_answers) if manager_answers is not None else None
+    return index.labels, user_values, manager_values
@@ -1,3 +1,35 @@
 from django.test import TestCase
 
-# Create your tests here.
+from reports.scoring import competency_score_matrix
+from users.models import CustomUser, Department
+
+from .models import Competency, Question, Survey, SurveyAnswer, SurveyQuestion, SurveyResponse
+from .scoring import competency_scores
+
+
+class CompetencyScoringTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Sprzedaż")
+        employee = CustomUser.objects.create_user("employee", password="pass", department=department)
+        # kompetencja utworzona później (wyższe id) ma pierwsze pytanie ankiety
+        communication = Competency.objects.create(name="Komunikacja")
+        teamwork = Competency.objects.create(name="Współpraca")
+        cls.survey = Survey.objects.create(name="Ocena roczna", department=department, role="employee")
+        cls.response = SurveyResponse.objects.create(survey=cls.survey, user=employee, status="submitted")
+        for order, (competency, value) in enumerate([(teamwork, 8), (communication, 4), (teamwork, 6)]):
+            question = Question.objects.create(text=f"Pytanie {order}", competency=competency, role="employee")
+            SurveyQuestion.objects.create(survey=cls.survey, question=question, order=order)
+            SurveyAnswer.objects.create(response=cls.response, question=question, scale_value=value)
+
+    def test_scores_follow_question_order(self):
+        answers = SurveyAnswer.objects.filter(response=self.response)
+        labels, user_values, manager_values = competency_scores(self.survey, answers)
+        self.assertEqual(labels, ["Współpraca", "Komunikacja"])
+        self.assertEqual(user_values, [70.0, 40.0])
+        self.assertIsNone(manager_values)
+
+    def test_same_axes_as_department_radar(self):
+        labels, _, _ = competency_scores(self.survey, [])
+        radar_labels, _ = competency_score_matrix(self.survey, [self.response])
+        self.assertEqual(labels, radar_labels)
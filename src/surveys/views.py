@@ -1,19 +1,10 @@
 # 0 ---    IMPORTY
 
 # Standardowe biblioteki
-import os
-import io
 import json
-import base64
 from functools import wraps
 from collections import OrderedDict
 
-# Biblioteki do wykresów
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import numpy as np
-
 # Django
 from django.conf import settings
 from django.db.models import Q
@@ -27,7 +18,6 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 from django.views.generic import TemplateView
 from django.utils.decorators import method_decorator
-from django.contrib.staticfiles.finders import find
 
 # Zewnętrzne biblioteki
 from wkhtmltopdf.views import PDFTemplateView
@@ -42,6 +32,19 @@ from .models import (
 # Formularze
 from .forms import QuestionForm, CompetencyForm, SurveyForm, SurveyFillForm
 
+# Punktacja kompetencji
+from .rows import answer_rows
+from .scoring import competency_scores
+
+# Podsumowania punktów do raportów
+from reports.summaries import refresh_response_summary
+
+# PDF - wspólne dane szablonu i kolejka generowania w tle
+from reports.pdf import PDF_CMD_OPTIONS, PDF_TEMPLATES, SURVEY_RESULT, survey_result_context
+from reports.pdf_backends import BackendPDFTemplateResponse, PDFRenderBusy
+from reports.pdf_jobs import pdf_response
+from reports.pdf_timing import measure, timed
+
 
 
 # SEKCJA 1 ----  DEKORATORY DOSTĘPU
@@ -421,6 +424,7 @@ def survey_fill(request, slug):
                     scale_value=scale_val if scale_val else None,
                     text_value=text_val if text_val else ""
                 )
+            refresh_response_summary(response)
             return redirect("home")
     else:
         form = SurveyFillForm(survey)
@@ -491,23 +495,14 @@ def survey_result(request, slug, user_id=None):
     scale_range = range(0, 11)
 
     # Przygotowanie danych do wykresu radar
-    radar_labels, radar_values = [], []
-    competencies = Competency.objects.all()
-    for comp in competencies:
-        comp_questions = survey.questions.filter(competency=comp)
-        if comp_questions.exists():
-            max_total = sum([10 for q in comp_questions])
-            user_total = sum([a.scale_value for a in answers if a.question in comp_questions and a.scale_value])
-            percentage = round(user_total / max_total * 100, 2) if max_total > 0 else 0
-            radar_labels.append(comp.name)
-            radar_values.append(percentage)
+    radar_labels, radar_values, _ = competency_scores(survey, answers)
 
     radar_data = list(zip(radar_labels, radar_values))
     show_radar = len(radar_labels) > 2
 
     return render(request, "surveys/survey_result.html", {
         "survey": survey,
-        "answers": answers,
+        "rows": answer_rows(survey, answers),
         "scale_range": scale_range,
         "radar_labels": radar_labels,
         "radar_values": radar_values,
@@ -552,6 +547,7 @@ def survey_edit_response(request, slug):
                         "text_value": text_val if text_val else ""
                     }
                 )
+            refresh_response_summary(response)
             return redirect("home")
     else:
         form = SurveyFillForm(survey, initial=initial_data)
@@ -579,16 +575,12 @@ def save_question_order(request, pk):
         return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
 # PDF ANKIETY - DLA ADMINA I MANAGERA i pracowika (ze sprawdzeniem dostępu)
+# Gotowy plik z dysku albo zlecenie dla manage.py pdf_worker (reports.pdf_jobs) - żądanie nie czeka na wkhtmltopdf
 @method_decorator(manager_or_privileged_access_required, name='dispatch')
 class SurveyPDFView(LoginRequiredMixin, PDFTemplateView):
-    template_name = "surveys/survey_pdf.html"
-
-    cmd_options = {
-        'footer-right': 'Strona [page] z [topage]',
-        'footer-font-size': '8',
-        'footer-spacing': '5',
-        'margin-bottom': '15mm',
-    }
+    template_name = PDF_TEMPLATES[SURVEY_RESULT]
+    cmd_options = PDF_CMD_OPTIONS
+    response_class = BackendPDFTemplateResponse
 
     def get_user(self):
         user_id = self.kwargs.get("user_id")
@@ -606,100 +598,31 @@ class SurveyPDFView(LoginRequiredMixin, PDFTemplateView):
         user = self.get_user()
         return f"{survey.name}_{survey.year}_{user.username}.pdf"
 
+    def get(self, request, *args, **kwargs):
+        response = (
+            SurveyResponse.objects
+            .filter(survey=self.get_survey(), user=self.get_user())
+            .select_related("survey", "user__department")
+            .order_by("pk")
+            .first()
+        )
+        if response is None:
+            # ankieta niewypełniona - pusty PDF renderowany od razu (bez odpowiedzi nie ma czego kolejkować)
+            try:
+                with measure(SURVEY_RESULT, "sync") as timer:
+                    result = super().get(request, *args, **kwargs).render()
+            except PDFRenderBusy:
+                return HttpResponse("Serwer generuje teraz zbyt wiele plików PDF. Spróbuj ponownie za chwilę.", status=503)
+            result["Server-Timing"] = timer.server_timing()
+            return result
+        return pdf_response(request, SURVEY_RESULT, response)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        survey = self.get_survey()
-        user = self.get_user()
-
-        # START: POPRAWIONE POBRANIE LOGO JAKO BASE64
-        logo_base64 = None
-        
-        # Użycie finders do zlokalizowania pliku w STATICFILES_DIRS
-        logo_path = find("ats.jpg") 
-
-        if logo_path and os.path.exists(logo_path):
-            try:
-                with open(logo_path, "rb") as f:
-                    logo_base64 = base64.b64encode(f.read()).decode("utf-8")
-            except Exception as e:
-                print(f"Błąd podczas kodowania logo do base64: {e}")
-                logo_base64 = None
-        else:
-            print("NIE ZNALEZIONO LOGO: ats_logo.png nie znaleziono w ścieżkach statycznych!")
-        # KONIEC: POPRAWIONE POBRANIE LOGO JAKO BASE64
-
-        # Pobranie odpowiedzi (niezmienione)
-        try:
-            # Użyj swoich modeli
-            response = SurveyResponse.objects.get(survey=survey, user=user) 
-            answers = SurveyAnswer.objects.filter(response=response)
-        except SurveyResponse.DoesNotExist:
-            answers = []
-
-        scale_range = range(0, 11)
-        # Upewnij się, że używasz właściwych klas/funkcji dla radar_labels i values
-        radar_labels, radar_values = self._calculate_competency_scores(survey, answers)
-        radar_image = self._generate_radar_chart(radar_labels, radar_values)
-        radar_data = list(zip(radar_labels, radar_values))
-        show_radar = len(radar_labels) > 2
-
-        context.update({
-            "survey": survey,
-            "answers": answers,
-            "scale_range": scale_range,
-            "radar_image": radar_image,
-            "radar_data": radar_data,
-            "user": user,
-            "show_radar": show_radar,
-            "logo_base64": logo_base64,  # <- Zmienna dla szablonu
-        })
+        with timed("context"):
+            context.update(survey_result_context(self.get_survey(), self.get_user()))
         return context
 
-    # Pamiętaj, że w tym miejscu muszą znajdować się też Twoje metody _calculate_competency_scores i _generate_radar_chart
-    def _calculate_competency_scores(self, survey, answers):
-        # ... (Twój obecny kod tej metody) ...
-        labels, values = [], []
-        raw_competencies = survey.questions.values_list("competency__name", flat=True).distinct()
-        competencies = [c for c in raw_competencies if c and str(c).strip()]
-        for comp in competencies:
-            comp_questions = survey.questions.filter(competency__name=comp)
-            max_total = comp_questions.count() * 10
-            user_total = sum(a.scale_value for a in answers
-                             if a.question in comp_questions and a.scale_value is not None)
-            percentage = round(user_total / max_total * 100, 2) if max_total > 0 else 0
-            labels.append(comp)
-            values.append(percentage)
-        return labels, values
-
-    def _generate_radar_chart(self, labels, values):
-        # ... (Twój obecny kod tej metody, wymaga importów matplotlib i numpy) ...
-        if not labels or not values:
-            return None
-        N = len(labels)
-        angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
-        angles_closed = angles + [angles[0]]
-        values_closed = values + [values[0]]
-
-        fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
-        ax.set_theta_offset(np.pi / 2)
-        ax.set_theta_direction(-1)
-        ax.set_xticks(angles)
-        ax.set_xticklabels(labels)
-        ax.set_ylim(0, 100)
-        ax.set_rlabel_position(0)
-        ax.grid(True)
-        ax.set_title("WYKRES KOMPETENCJI", va='bottom', fontsize=14, fontweight='bold', pad=34)
-
-        ax.plot(angles_closed, values_closed, linewidth=2, linestyle='solid', color='blue')
-        ax.fill(angles_closed, values_closed, 'blue', alpha=0.1)
-
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        image_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close(fig)
-        return image_base64
-
 # --- IGNORE AWARYJNA METODA DO TWORZENIA PDFa - tworzy duży plik ---
 # class SurveyPDFView(LoginRequiredMixin, TemplateView):
 #     template_name = "surveys/survey_pdf.html"